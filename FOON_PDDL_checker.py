@@ -0,0 +1,261 @@
+from __future__ import print_function
+
+'''
+FOON_PDDL_checker (Consistency Checker for FOON_to_PDDL):
+---------------------------------------------------------
+-- Written and maintained by:
+    * David Paulius (dpaulius@cs.brown.edu / davidpaulius@tum.de)
+
+NOTE: this module checks a generated domain and problem file for mistakes that would otherwise only be found after a
+    planner fails to find a plan (i.e., the "rogue predicates" mentioned in the README). Both files are parsed into
+    symbol tables (see PDDLSymbols), which are then used to report the following:
+    1. constants or predicates that are used but never declared.
+    2. goal facts that are not in the initial state and that are not added by any action.
+    3. facts that only ever appear negated (i.e., they are deleted or negated but never true or needed).
+    4. actions that can never be used, since their preconditions are not reachable from the initial state.
+
+    Files can be checked from the command line as follows:
+    >> python FOON_PDDL_checker.py example_domain.pddl example_problem.pddl
+'''
+
+''' License
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with this program. If not, see https://www.gnu.org/licenses/.
+'''
+
+import sys
+import time
+
+import FOON_plan_cache as fpc
+
+# -- logical connectives that can be found in preconditions, effects and goals (i.e., these are not predicates):
+connectives = ['and', 'or', 'not', 'imply', 'forall', 'exists', 'when']
+
+
+class PDDLSymbols(object):
+    # NOTE: symbol tables of a domain and problem, where facts are kept as tuples (e.g., ('in', 'cup', 'water')):
+
+    def __init__(self):
+        # -- constants (and problem objects) and predicates (mapped to their number of arguments):
+        self.constants = set()
+        self.predicates = {}
+
+        # -- actions map each action's name to a dictionary of its positive and negative preconditions and its add and delete effects:
+        self.actions = {}
+
+        self.init = set()
+        self.goals = []
+
+        # -- facts that appear positively or negatively anywhere in either file:
+        self.positive_facts = set()
+        self.negative_facts = set()
+
+        # -- actions with parameters cannot be checked for reachability, since their facts are not ground:
+        self.lifted_actions = set()
+    #enddef
+
+    def _readDomain(self, expression):
+        for section in expression:
+            if not isinstance(section, list) or not section:
+                continue
+
+            if section[0] == ':constants':
+                self.constants.update(_get_typed_names(section[1:]))
+
+            elif section[0] == ':predicates':
+                for P in section[1:]:
+                    if isinstance(P, list) and P:
+                        self.predicates[P[0]] = len(_get_typed_names(P[1:]))
+
+            elif section[0] == ':action':
+                self._readAction(section)
+    #enddef
+
+    def _readAction(self, section):
+        action = {'pre': set(), 'neg_pre': set(), 'add': set(), 'del': set()}
+        self.actions[section[1]] = action
+
+        for X in range(2, len(section) - 1):
+            if section[X] == ':parameters' and section[X + 1]:
+                self.lifted_actions.add(section[1])
+            elif section[X] == ':precondition':
+                self._readLiterals(section[X + 1], action['pre'], action['neg_pre'])
+            elif section[X] == ':effect':
+                self._readLiterals(section[X + 1], action['add'], action['del'])
+    #enddef
+
+    def _readProblem(self, expression):
+        for section in expression:
+            if not isinstance(section, list) or not section:
+                continue
+
+            if section[0] == ':objects':
+                self.constants.update(_get_typed_names(section[1:]))
+
+            elif section[0] == ':init':
+                self._readLiterals(['and'] + section[1:], self.init, set())
+
+            elif section[0] == ':goal' and len(section) > 1:
+                goals = set()
+                self._readLiterals(section[1], goals, set())
+                self.goals = sorted(goals)
+    #enddef
+
+    def _readLiterals(self, expression, positive, negative, negated=False):
+        # -- collect the facts found in a (possibly nested) expression, where facts under 'not' are negative:
+        if not isinstance(expression, list) or not expression:
+            return
+
+        if expression[0] in connectives:
+            for E in expression[1:]:
+                self._readLiterals(E, positive, negative, negated=(not negated) if expression[0] == 'not' else negated)
+            return
+
+        fact = tuple(expression)
+        if negated:
+            negative.add(fact)
+            self.negative_facts.add(fact)
+        else:
+            positive.add(fact)
+            self.positive_facts.add(fact)
+    #enddef
+#endclass
+
+
+def _get_typed_names(tokens):
+    # -- remove types from a typed list (e.g., "bottle cup - object") to get only the names:
+    names = []
+    X = 0
+    while X < len(tokens):
+        if tokens[X] == '-':
+            X += 2
+            continue
+        if not isinstance(tokens[X], list):
+            names.append(tokens[X])
+        X += 1
+    return names
+#enddef
+
+
+def _get_symbols(domain_text, problem_text):
+    symbols = PDDLSymbols()
+    for expression in fpc._parse_PDDL(domain_text):
+        symbols._readDomain(expression)
+    for expression in fpc._parse_PDDL(problem_text):
+        symbols._readProblem(expression)
+    return symbols
+#enddef
+
+
+def _find_reachable_actions(symbols):
+    # NOTE: this is a relaxed reachability check (i.e., delete effects and negative preconditions are ignored):
+    #	an action is reachable once all of its preconditions are either in the initial state or added by a reachable action.
+    #	Each action keeps a count of preconditions that are not yet reached, so every fact is only visited once.
+    waiting_actions = {}
+    remaining = {}
+    for name, action in symbols.actions.items():
+        remaining[name] = len(action['pre'])
+        for fact in action['pre']:
+            waiting_actions.setdefault(fact, []).append(name)
+
+    reachable = set(name for name in symbols.actions if remaining[name] == 0 or name in symbols.lifted_actions)
+    queue = list(symbols.init)
+    for name in reachable:
+        queue.extend(symbols.actions[name]['add'])
+
+    while queue:
+        fact = queue.pop()
+        for name in waiting_actions.pop(fact, []):
+            remaining[name] -= 1
+            if remaining[name] == 0 and name not in reachable:
+                reachable.add(name)
+                queue.extend(symbols.actions[name]['add'])
+
+    return reachable
+#enddef
+
+
+def _check_PDDL(domain_text, problem_text):
+    # NOTE: this function returns a dictionary of problems found in the given domain and problem, where each key
+    #	is the kind of problem and its value is a sorted list of the facts, symbols or actions that caused it.
+    symbols = _get_symbols(domain_text, problem_text)
+
+    results = {
+        'undeclared_constants': set(),
+        'undeclared_predicates': set(),
+        'unreachable_goals': [],
+        'only_negated_facts': [],
+        'unused_actions': [],
+    }
+
+    for fact in symbols.positive_facts | symbols.negative_facts:
+        if symbols.predicates.get(fact[0]) != len(fact) - 1:
+            results['undeclared_predicates'].add(fact[0] + '/' + str(len(fact) - 1))
+        for argument in fact[1:]:
+            if not argument.startswith('?') and argument not in symbols.constants:
+                results['undeclared_constants'].add(argument)
+
+    added_facts = set()
+    for action in symbols.actions.values():
+        added_facts |= action['add']
+
+    results['unreachable_goals'] = [G for G in symbols.goals if G not in symbols.init and G not in added_facts]
+
+    results['only_negated_facts'] = sorted(symbols.negative_facts - symbols.positive_facts)
+
+    if not symbols.lifted_actions:
+        reachable = _find_reachable_actions(symbols)
+        results['unused_actions'] = sorted(name for name in symbols.actions if name not in reachable)
+
+    results['undeclared_constants'] = sorted(results['undeclared_constants'])
+    results['undeclared_predicates'] = sorted(results['undeclared_predicates'])
+
+    return results
+#enddef
+
+
+def _print_results(results, elapsed_time=None):
+    descriptions = {
+        'undeclared_constants': 'Constants that were not declared',
+        'undeclared_predicates': 'Predicates that were not declared (or used with the wrong number of arguments)',
+        'unreachable_goals': 'Goal facts that are not in the initial state and are not added by any action',
+        'only_negated_facts': 'Facts that only ever appear negated',
+        'unused_actions': 'Actions that can never be used (preconditions are not reachable from the initial state)',
+    }
+
+    num_problems = sum(len(results[K]) for K in results)
+    print(' -- [FOON_PDDL_checker] : ' + ('no problems were found' if num_problems == 0 else str(num_problems) + ' problem(s) found')
+          + (' (' + str(round(elapsed_time * 1000.0, 2)) + ' ms)' if elapsed_time is not None else '') + '.')
+
+    for K in ['undeclared_constants', 'undeclared_predicates', 'unreachable_goals', 'only_negated_facts', 'unused_actions']:
+        if not results[K]:
+            continue
+        print('  -- ' + descriptions[K] + ':')
+        for item in results[K]:
+            print('\t' + ('(' + ' '.join(item) + ')' if isinstance(item, tuple) else item))
+#enddef
+
+
+def _check_files(domain_text, problem_text, verbose=True):
+    start_time = time.time()
+    results = _check_PDDL(domain_text, problem_text)
+    elapsed_time = time.time() - start_time
+
+    if verbose:
+        _print_results(results, elapsed_time)
+
+    return results
+#enddef
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        sys.exit(' -- usage: python FOON_PDDL_checker.py <domain file> <problem file>')
+
+    import FOON_output_sinks as fos
+
+    results = _check_files(fos._read_output(sys.argv[1]), fos._read_output(sys.argv[2]))
+
+    # -- exit with an error code if any problem was found (e.g., for checking files in a batch script):
+    sys.exit(1 if any(results[K] for K in results) else 0)
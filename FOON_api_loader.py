@@ -0,0 +1,41 @@
+from __future__ import print_function
+
+'''
+FOON_api_loader (Loader for the FOON API used by FOON_to_PDDL):
+----------------------------------------------------------------
+-- Written and maintained by:
+    * David Paulius (dpaulius@cs.brown.edu / davidpaulius@tum.de)
+
+NOTE: this module finds and imports the FOON graph analyser (FGA) from the FOON API directory, so that every script
+    that needs to load subgraph files (i.e., FOON_to_PDDL.py and FOON_database.py) imports it in the same way.
+'''
+
+''' License
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with this program. If not, see https://www.gnu.org/licenses/.
+'''
+
+import sys
+import os
+
+# -- path to the FOON API scripts:
+path_to_FOON_code = os.path.join(os.path.dirname(os.path.abspath(__file__)), './foon_api/')
+
+
+def _import_FGA():
+    # NOTE: we need to import some files from the FOON API directory:
+    if path_to_FOON_code not in sys.path:
+        # -- add the directory to the FOON API scripts to the current path:
+        sys.path.append(path_to_FOON_code)
+
+    try:
+        import FOON_graph_analyser
+    except ImportError:
+        print(" -- ERROR: Missing 'FOON_graph_analyzer.py'!")
+        print("\t-- Download here: https://github.com/davidpaulius/foon_api")
+        sys.exit()
+    #end
+
+    return FOON_graph_analyser
+#enddef
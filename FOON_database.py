@@ -0,0 +1,440 @@
+from __future__ import print_function
+
+'''
+FOON_database (SQLite Store of FOON Subgraphs for FOON_to_PDDL):
+----------------------------------------------------------------
+-- Written and maintained by:
+    * David Paulius (dpaulius@cs.brown.edu / davidpaulius@tum.de)
+
+NOTE: this module imports FOON subgraph files into an SQLite database, so that corpora which are too large to keep in
+    the FGA's lists can be converted to PDDL by streaming functional units from SQL queries (see _stream_units()).
+    The database has the following tables:
+    1. subgraphs -- one row per imported subgraph file (with a hash of its contents, so that edited files are imported again).
+    2. units -- functional units (with their motion), in the order they appear in their subgraph.
+    3. objects -- object nodes (label, states and ingredients), shared by all subgraphs.
+    4. states -- the states of each object node (for looking up objects by state).
+    5. unit_objects -- edges between units and the objects they consume (inputs) or produce (outputs).
+
+    Questions such as "which units produce chopped tomato?" can then be answered without parsing any files:
+    >> python FOON_database.py --database='corpus.db' --produces='tomato' --state='chopped'
+'''
+
+''' License
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with this program. If not, see https://www.gnu.org/licenses/.
+'''
+
+import sys
+import os
+import json
+import getopt
+import sqlite3
+import hashlib
+import itertools
+
+database_schema = '''
+CREATE TABLE IF NOT EXISTS subgraphs (
+    id INTEGER PRIMARY KEY,
+    file_name TEXT UNIQUE NOT NULL,
+    file_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY,
+    subgraph_id INTEGER NOT NULL REFERENCES subgraphs(id),
+    unit_index INTEGER NOT NULL,
+    motion TEXT NOT NULL,
+    sentence TEXT
+);
+CREATE TABLE IF NOT EXISTS objects (
+    id INTEGER PRIMARY KEY,
+    node_key TEXT UNIQUE NOT NULL,
+    label TEXT NOT NULL,
+    object_key TEXT,
+    states TEXT,
+    ingredients TEXT
+);
+CREATE TABLE IF NOT EXISTS states (
+    object_id INTEGER NOT NULL REFERENCES objects(id),
+    position INTEGER NOT NULL,
+    state_id TEXT,
+    state TEXT NOT NULL,
+    relative_object TEXT
+);
+CREATE TABLE IF NOT EXISTS unit_objects (
+    unit_id INTEGER NOT NULL REFERENCES units(id),
+    object_id INTEGER NOT NULL REFERENCES objects(id),
+    is_input INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    descriptor INTEGER,
+    is_goal INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS units_by_subgraph ON units(subgraph_id, unit_index);
+CREATE INDEX IF NOT EXISTS units_by_motion ON units(motion);
+CREATE INDEX IF NOT EXISTS objects_by_label ON objects(label);
+CREATE INDEX IF NOT EXISTS states_by_state ON states(state, object_id);
+CREATE INDEX IF NOT EXISTS states_by_object ON states(object_id);
+CREATE INDEX IF NOT EXISTS unit_objects_by_unit ON unit_objects(unit_id, is_input, position);
+CREATE INDEX IF NOT EXISTS unit_objects_by_object ON unit_objects(object_id, is_input);
+'''
+
+
+class StoredObject(object):
+    # NOTE: an object node read from the database, which has the same methods as FOON.Object that are needed for translation:
+
+    def __init__(self, label, object_key, states, ingredients, is_goal=False):
+        self.label = label
+        self.object_key = object_key
+        self.states = json.loads(states) if states else []
+        self.ingredients = json.loads(ingredients) if ingredients else []
+        self.isGoal = bool(is_goal)
+    #enddef
+
+    def getObjectLabel(self):
+        return self.label
+    #enddef
+
+    def getObjectKey(self):
+        return self.object_key
+    #enddef
+
+    def getStatesList(self):
+        return self.states
+    #enddef
+
+    def getIngredients(self):
+        return self.ingredients
+    #enddef
+
+    def hasIngredients(self):
+        return len(self.ingredients) > 0
+    #enddef
+
+    def is_objectNode(self):
+        return True
+    #enddef
+#endclass
+
+
+class StoredMotion(object):
+
+    def __init__(self, label):
+        self.label = label
+    #enddef
+
+    def getMotionLabel(self):
+        return self.label
+    #enddef
+#endclass
+
+
+class StoredUnit(object):
+    # NOTE: a functional unit read from the database, which has the same methods as FOON.FunctionalUnit that are needed for translation:
+
+    def __init__(self, motion, sentence):
+        self.motion = StoredMotion(motion)
+        self.sentence = sentence
+        self.inputs, self.outputs = [], []
+        self.input_descriptors, self.output_descriptors = [], []
+    #enddef
+
+    def getMotion(self):
+        return self.motion
+    #enddef
+
+    def getMotionNode(self):
+        return self.motion
+    #enddef
+
+    def getInputList(self):
+        return self.inputs
+    #enddef
+
+    def getInputNodes(self):
+        return self.inputs
+    #enddef
+
+    def getOutputList(self):
+        return self.outputs
+    #enddef
+
+    def getOutputNodes(self):
+        return self.outputs
+    #enddef
+
+    def getNumberOfInputs(self):
+        return len(self.inputs)
+    #enddef
+
+    def getNumberOfOutputs(self):
+        return len(self.outputs)
+    #enddef
+
+    def getInputDescriptor(self, index):
+        return self.input_descriptors[index]
+    #enddef
+
+    def getMotionDescriptor(self, index, is_input=True):
+        return self.input_descriptors[index] if is_input else self.output_descriptors[index]
+    #enddef
+
+    def getWord2VecSentence(self):
+        return self.sentence
+    #enddef
+#endclass
+
+
+def _connect(database_file):
+    connection = sqlite3.connect(database_file)
+    connection.executescript(database_schema)
+
+    # -- databases made before file hashes were stored need the extra column (their subgraphs will be imported again):
+    if 'file_hash' not in [column[1] for column in connection.execute('PRAGMA table_info(subgraphs)')]:
+        connection.execute('ALTER TABLE subgraphs ADD COLUMN file_hash TEXT')
+        connection.commit()
+
+    return connection
+#enddef
+
+
+def _get_node_key(N):
+    # -- object nodes are considered the same if they have the same label, states and ingredients:
+    return json.dumps([N.getObjectLabel(), [list(S) for S in N.getStatesList()], list(N.getIngredients())])
+#enddef
+
+
+def _get_subgraph_id(connection, file_name):
+    row = connection.execute('SELECT id FROM subgraphs WHERE file_name = ?', (os.path.abspath(file_name),)).fetchone()
+    return row[0] if row else None
+#enddef
+
+
+def _hash_file(file_name):
+    with open(file_name, 'rb') as subgraph_file:
+        return hashlib.sha1(subgraph_file.read()).hexdigest()
+#enddef
+
+
+def _is_subgraph_current(connection, file_name):
+    # -- a subgraph is current if it was imported from a file with the same contents as the file on disk:
+    row = connection.execute('SELECT file_hash FROM subgraphs WHERE file_name = ?', (os.path.abspath(file_name),)).fetchone()
+    return row is not None and row[0] == _hash_file(file_name)
+#enddef
+
+
+def _import_subgraph(connection, file_name):
+    # NOTE: this function loads a subgraph file with the FGA and stores its units and object nodes in the database;
+    #	if the file was already imported, its units are replaced. The id of the subgraph is returned.
+    import FOON_api_loader as fal
+    fga = fal._import_FGA()
+
+    # -- make sure that functional units from any other file are removed before loading this one:
+    if hasattr(fga, '_resetFOON'):
+        fga._resetFOON()
+    fga._constructFOON(file_name)
+
+    file_hash = _hash_file(file_name)
+
+    object_ids = {}
+
+    def _get_object_id(N):
+        node_key = _get_node_key(N)
+        if node_key in object_ids:
+            return object_ids[node_key]
+
+        row = connection.execute('SELECT id FROM objects WHERE node_key = ?', (node_key,)).fetchone()
+        if row:
+            object_ids[node_key] = row[0]
+            return row[0]
+
+        cursor = connection.execute('INSERT INTO objects (node_key, label, object_key, states, ingredients) VALUES (?, ?, ?, ?, ?)',
+            (node_key, N.getObjectLabel(), N.getObjectKey(), json.dumps([list(S) for S in N.getStatesList()]), json.dumps(list(N.getIngredients()))))
+
+        connection.executemany('INSERT INTO states (object_id, position, state_id, state, relative_object) VALUES (?, ?, ?, ?, ?)',
+            [(cursor.lastrowid, X, str(S[0]), S[1], (S[2] if len(S) > 2 and S[2] else None)) for X, S in enumerate(N.getStatesList())])
+
+        object_ids[node_key] = cursor.lastrowid
+        return cursor.lastrowid
+    #enddef
+
+    with connection:
+        subgraph_id = _get_subgraph_id(connection, file_name)
+        if subgraph_id is not None:
+            connection.execute('DELETE FROM unit_objects WHERE unit_id IN (SELECT id FROM units WHERE subgraph_id = ?)', (subgraph_id,))
+            connection.execute('DELETE FROM units WHERE subgraph_id = ?', (subgraph_id,))
+            connection.execute('UPDATE subgraphs SET file_hash = ? WHERE id = ?', (file_hash, subgraph_id))
+        else:
+            subgraph_id = connection.execute('INSERT INTO subgraphs (file_name, file_hash) VALUES (?, ?)', (os.path.abspath(file_name), file_hash)).lastrowid
+
+        for index, FU in enumerate(fga.FOON_lvl3):
+            unit_id = connection.execute('INSERT INTO units (subgraph_id, unit_index, motion, sentence) VALUES (?, ?, ?, ?)',
+                (subgraph_id, index, FU.getMotion().getMotionLabel(), FU.getWord2VecSentence())).lastrowid
+
+            edges = []
+            for is_input, nodes in [(1, FU.getInputList()), (0, FU.getOutputList())]:
+                for X, N in enumerate(nodes):
+                    edges.append((unit_id, _get_object_id(N), is_input, X, FU.getMotionDescriptor(X, is_input=bool(is_input)), int(bool(N.isGoal) and not is_input)))
+
+            connection.executemany('INSERT INTO unit_objects (unit_id, object_id, is_input, position, descriptor, is_goal) VALUES (?, ?, ?, ?, ?, ?)', edges)
+        #endfor
+    #endwith
+
+    return subgraph_id
+#enddef
+
+
+def _select_relevant_units(connection, subgraph_id):
+    # NOTE: for goal pruning, only units that (directly or indirectly) produce a goal node are kept;
+    #	their ids are kept in a temporary table rather than in memory. If a subgraph has no goals, all units are kept.
+    connection.execute('DROP TABLE IF EXISTS temp.relevant_units')
+    connection.execute('''
+        CREATE TEMP TABLE relevant_units AS
+        WITH RECURSIVE needed(object_id) AS (
+            SELECT uo.object_id FROM unit_objects uo JOIN units u ON u.id = uo.unit_id
+            WHERE u.subgraph_id = :subgraph AND uo.is_input = 0 AND uo.is_goal = 1
+            UNION
+            SELECT i.object_id FROM needed n
+            JOIN unit_objects o ON o.object_id = n.object_id AND o.is_input = 0
+            JOIN units u ON u.id = o.unit_id AND u.subgraph_id = :subgraph
+            JOIN unit_objects i ON i.unit_id = o.unit_id AND i.is_input = 1
+        )
+        SELECT DISTINCT o.unit_id AS unit_id FROM unit_objects o JOIN units u ON u.id = o.unit_id
+        WHERE u.subgraph_id = :subgraph AND o.is_input = 0 AND o.object_id IN (SELECT object_id FROM needed)''', {'subgraph': subgraph_id})
+
+    if connection.execute('SELECT COUNT(*) FROM temp.relevant_units').fetchone()[0] == 0:
+        connection.execute('INSERT INTO temp.relevant_units SELECT id FROM units WHERE subgraph_id = ?', (subgraph_id,))
+#enddef
+
+
+def _get_unit_filter(goal_pruning):
+    return ' AND u.id IN (SELECT unit_id FROM temp.relevant_units)' if goal_pruning else ''
+#enddef
+
+
+def _stream_units(connection, subgraph_id, goal_pruning=False):
+    # NOTE: this is a generator of tuples (unit_index, StoredUnit) in the order that units appear in the subgraph;
+    #	rows are read from a single query one unit at a time, so memory use does not grow with the size of the subgraph.
+    cursor = connection.execute('''
+        SELECT u.unit_index, u.motion, u.sentence, uo.is_input, uo.descriptor, uo.is_goal, o.label, o.object_key, o.states, o.ingredients
+        FROM units u JOIN unit_objects uo ON uo.unit_id = u.id JOIN objects o ON o.id = uo.object_id
+        WHERE u.subgraph_id = ?''' + _get_unit_filter(goal_pruning) + '''
+        ORDER BY u.unit_index, uo.is_input DESC, uo.position''', (subgraph_id,))
+
+    for unit_index, rows in itertools.groupby(cursor, key=lambda row: row[0]):
+        unit = None
+        for row in rows:
+            if unit is None:
+                unit = StoredUnit(row[1], row[2])
+
+            N = StoredObject(row[6], row[7], row[8], row[9], is_goal=row[5])
+            if row[3]:
+                unit.inputs.append(N)
+                unit.input_descriptors.append(row[4])
+            else:
+                unit.outputs.append(N)
+                unit.output_descriptors.append(row[4])
+
+        yield unit_index, unit
+#enddef
+
+
+def _get_object_labels(connection, subgraph_id, goal_pruning=False):
+    # -- labels of all objects in a subgraph, sorted in alphabetical order:
+    return [row[0] for row in connection.execute('''
+        SELECT DISTINCT o.label FROM units u JOIN unit_objects uo ON uo.unit_id = u.id JOIN objects o ON o.id = uo.object_id
+        WHERE u.subgraph_id = ?''' + _get_unit_filter(goal_pruning) + ' ORDER BY o.label', (subgraph_id,))]
+#enddef
+
+
+def _get_starting_nodes(connection, subgraph_id, goal_pruning=False):
+    # -- starting nodes are input objects that are never produced by any unit (in the order they are first seen):
+    return [StoredObject(*row) for row in connection.execute('''
+        SELECT o.label, o.object_key, o.states, o.ingredients FROM units u JOIN unit_objects uo ON uo.unit_id = u.id JOIN objects o ON o.id = uo.object_id
+        WHERE u.subgraph_id = :subgraph AND uo.is_input = 1''' + _get_unit_filter(goal_pruning) + '''
+        AND uo.object_id NOT IN (
+            SELECT uo.object_id FROM units u JOIN unit_objects uo ON uo.unit_id = u.id
+            WHERE u.subgraph_id = :subgraph AND uo.is_input = 0''' + _get_unit_filter(goal_pruning) + ''')
+        GROUP BY o.id ORDER BY MIN(u.unit_index * 1000 + uo.position)''', {'subgraph': subgraph_id})]
+#enddef
+
+
+def _get_goal_nodes(connection, subgraph_id):
+    return [StoredObject(*row, is_goal=True) for row in connection.execute('''
+        SELECT o.label, o.object_key, o.states, o.ingredients FROM units u JOIN unit_objects uo ON uo.unit_id = u.id JOIN objects o ON o.id = uo.object_id
+        WHERE u.subgraph_id = ? AND uo.is_input = 0 AND uo.is_goal = 1
+        GROUP BY o.id ORDER BY MIN(u.unit_index * 1000 + uo.position)''', (subgraph_id,))]
+#enddef
+
+
+def _find_units(connection, label, state=None, is_input=False):
+    # NOTE: this function finds all units that produce (or consume, if is_input is True) an object with a given label,
+    #	optionally in a given state (e.g., _find_units(connection, 'tomato', state='chopped') for "which units produce chopped tomato?").
+    #	It returns a list of tuples (file name, unit index, motion, description).
+    query = '''
+        SELECT DISTINCT s.file_name, u.unit_index, u.motion, u.sentence FROM objects o
+        JOIN unit_objects uo ON uo.object_id = o.id AND uo.is_input = ?
+        JOIN units u ON u.id = uo.unit_id JOIN subgraphs s ON s.id = u.subgraph_id
+        WHERE o.label = ?'''
+    parameters = [int(is_input), label]
+
+    if state:
+        query += ' AND o.id IN (SELECT object_id FROM states WHERE state = ?)'
+        parameters.append(state)
+
+    return connection.execute(query + ' ORDER BY s.file_name, u.unit_index', parameters).fetchall()
+#enddef
+
+
+def _find_units_by_motion(connection, motion):
+    return connection.execute('''
+        SELECT s.file_name, u.unit_index, u.motion, u.sentence FROM units u JOIN subgraphs s ON s.id = u.subgraph_id
+        WHERE u.motion = ? ORDER BY s.file_name, u.unit_index''', (motion,)).fetchall()
+#enddef
+
+
+def _check_args():
+    database_file, files_to_import, query = None, [], {}
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'h', ['database=', 'import', 'produces=', 'consumes=', 'state=', 'motion=', 'help'])
+
+        for opt, arg in opts:
+            if opt == '--database':
+                database_file = str(arg)
+            elif opt == '--import':
+                files_to_import = args
+            elif opt in ('--produces', '--consumes', '--state', '--motion'):
+                query[opt[2:]] = str(arg)
+            else:
+                print(" -- usage: python FOON_database.py --database='corpus.db' [--import <subgraph files>]"
+                      " [--produces='label' / --consumes='label' [--state='state']] [--motion='motion']")
+                sys.exit()
+    except getopt.GetoptError:
+        sys.exit()
+
+    return database_file, files_to_import, query
+#enddef
+
+
+if __name__ == '__main__':
+    database_file, files_to_import, query = _check_args()
+
+    if not database_file:
+        sys.exit(" -- ERROR: A database file must be given with --database='<file>'!")
+
+    connection = _connect(database_file)
+
+    for file_name in files_to_import:
+        print(" -- [FOON_database] : Importing file '" + file_name + "'...")
+        _import_subgraph(connection, file_name)
+
+    results = []
+    if 'produces' in query or 'consumes' in query:
+        is_input = 'consumes' in query
+        results = _find_units(connection, query['consumes' if is_input else 'produces'], state=query.get('state'), is_input=is_input)
+    elif 'motion' in query:
+        results = _find_units_by_motion(connection, query['motion'])
+
+    for file_name, unit_index, motion, sentence in results:
+        print('  -- ' + file_name + ' : unit ' + str(unit_index) + ' (' + motion + ') - ' + str(sentence))
+
+    connection.close()
@@ -0,0 +1,245 @@
+from __future__ import print_function
+
+'''
+FOON_output_sinks (Output Sinks for FOON_to_PDDL):
+--------------------------------------------------
+-- Written and maintained by:
+    * David Paulius (dpaulius@cs.brown.edu / davidpaulius@tum.de)
+
+NOTE: generated PDDL definitions are written through a sink rather than directly to a file. All sinks act like a file
+    opened for writing (i.e., they have write() and close()), but they collect many small writes into a buffer so that
+    large domains need far fewer system calls. The following sinks are available:
+    1. AtomicFileSink -- writes to a temporary file that replaces the target only once it is closed (default).
+    2. GzipFileSink -- same as above, but the output is compressed with gzip.
+    3. StdoutSink -- streams the output to stdout (e.g., for piping straight into a planner).
+    4. MemorySink -- keeps the output in memory (see memory_outputs and _read_output()).
+'''
+
+''' License
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with this program. If not, see https://www.gnu.org/licenses/.
+'''
+
+import sys
+import os
+import tempfile
+
+# -- number of characters that are collected before they are passed on in a single write:
+default_buffer_size = 1 << 16
+
+# -- outputs kept by MemorySink objects, where keys are the file names given to each sink:
+memory_outputs = {}
+
+
+class BufferedSink(object):
+    # NOTE: subclasses only need to define _flushBuffer() (and optionally _finalize() and _discard()):
+
+    def __init__(self, name, buffer_size=default_buffer_size):
+        self.name = name
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.buffered_chars = 0
+        self.closed = False
+    #enddef
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.buffered_chars += len(text)
+        if self.buffered_chars >= self.buffer_size:
+            self.flush()
+    #enddef
+
+    def flush(self):
+        if self.buffer:
+            self._flushBuffer(''.join(self.buffer))
+            self.buffer, self.buffered_chars = [], 0
+    #enddef
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self._finalize()
+        self.closed = True
+    #enddef
+
+    def discard(self):
+        # -- throw away everything that was written (e.g., if an error occurred while writing):
+        if self.closed:
+            return
+        self.buffer, self.buffered_chars = [], 0
+        self._discard()
+        self.closed = True
+    #enddef
+
+    def __enter__(self):
+        return self
+    #enddef
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+    #enddef
+
+    def _flushBuffer(self, text):
+        raise NotImplementedError
+    #enddef
+
+    def _finalize(self):
+        pass
+    #enddef
+
+    def _discard(self):
+        pass
+    #enddef
+#endclass
+
+
+class AtomicFileSink(BufferedSink):
+    # NOTE: the target file is only replaced once the sink is closed, so a crash or kill while writing
+    #	will never leave a half-written file behind for a planner to read.
+
+    def __init__(self, name, buffer_size=default_buffer_size):
+        super(AtomicFileSink, self).__init__(name, buffer_size)
+        self.temp_fd, self.temp_name = tempfile.mkstemp(prefix='.' + os.path.basename(name) + '.', suffix='.tmp', dir=os.path.dirname(os.path.abspath(name)))
+        self.file = self._openFile(os.fdopen(self.temp_fd, 'wb'))
+    #enddef
+
+    def _openFile(self, raw_file):
+        return raw_file
+    #enddef
+
+    def _flushBuffer(self, text):
+        self.file.write(text.encode('utf-8'))
+    #enddef
+
+    def _closeFile(self, sync=False):
+        if sync:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.file.close()
+    #enddef
+
+    def _finalize(self):
+        # -- the temporary file is synced to disk before it replaces the target, so that an OS crash or power loss
+        #	after the rename cannot leave an empty or truncated file in its place:
+        self._closeFile(sync=True)
+
+        # -- temporary files are only readable by their owner, so give the file the usual permissions before replacing the target:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(self.temp_name, 0o666 & ~umask)
+
+        os.replace(self.temp_name, self.name)
+
+        # -- the rename itself is only durable once the directory holding the file is synced (where the OS allows it):
+        if hasattr(os, 'O_DIRECTORY'):
+            directory_fd = os.open(os.path.dirname(os.path.abspath(self.name)), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(directory_fd)
+            finally:
+                os.close(directory_fd)
+    #enddef
+
+    def _discard(self):
+        self._closeFile()
+        try:
+            os.remove(self.temp_name)
+        except OSError:
+            pass
+    #enddef
+#endclass
+
+
+class GzipFileSink(AtomicFileSink):
+
+    def _openFile(self, raw_file):
+        import gzip
+        self.raw_file = raw_file
+        return gzip.GzipFile(filename=os.path.basename(self.name).replace('.gz', ''), mode='wb', fileobj=raw_file)
+    #enddef
+
+    def _closeFile(self, sync=False):
+        # -- closing a GzipFile does not close the file object that it wraps (which is synced once the gzip trailer is written):
+        self.file.close()
+        if sync:
+            self.raw_file.flush()
+            os.fsync(self.raw_file.fileno())
+        self.raw_file.close()
+    #enddef
+#endclass
+
+
+class StdoutSink(BufferedSink):
+
+    def __init__(self, name='-', buffer_size=default_buffer_size, stream=None):
+        super(StdoutSink, self).__init__(name, buffer_size)
+        # -- sys.__stdout__ is used by default since messages may be redirected while PDDL is streamed to stdout:
+        self.stream = stream if stream else sys.__stdout__
+    #enddef
+
+    def _flushBuffer(self, text):
+        self.stream.write(text)
+    #enddef
+
+    def _finalize(self):
+        # -- separate consecutive definitions (e.g., domain then problem) with a new line:
+        self.stream.write('\n')
+        self.stream.flush()
+    #enddef
+#endclass
+
+
+class MemorySink(BufferedSink):
+
+    def __init__(self, name, buffer_size=default_buffer_size):
+        super(MemorySink, self).__init__(name, buffer_size)
+        self.chunks = []
+    #enddef
+
+    def _flushBuffer(self, text):
+        self.chunks.append(text)
+    #enddef
+
+    def _finalize(self):
+        memory_outputs[self.name] = ''.join(self.chunks)
+    #enddef
+
+    def getvalue(self):
+        return ''.join(self.chunks) + ''.join(self.buffer)
+    #enddef
+#endclass
+
+
+def _open_sink(file_name, target=None):
+    # NOTE: target takes the value of either:
+    #   1. None -- write the file atomically (compressed with gzip if the file name ends with '.gz').
+    #   2. '-' -- stream to stdout.
+    #   3. 'memory' -- keep the output in memory under the given file name.
+    #   4. 'gzip' -- write the file atomically and compress it with gzip.
+    if target == '-':
+        return StdoutSink()
+    elif target == 'memory':
+        return MemorySink(file_name)
+    elif target == 'gzip' or file_name.endswith('.gz'):
+        return GzipFileSink(file_name)
+    return AtomicFileSink(file_name)
+#enddef
+
+
+def _read_output(file_name):
+    # -- read back an output written by any sink (other than stdout):
+    if file_name in memory_outputs:
+        return memory_outputs[file_name]
+
+    if file_name.endswith('.gz'):
+        import gzip
+        with gzip.open(file_name, 'rt') as F:
+            return F.read()
+
+    with open(file_name, 'r') as F:
+        return F.read()
+#enddef
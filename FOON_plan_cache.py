@@ -0,0 +1,248 @@
+from __future__ import print_function
+
+'''
+FOON_plan_cache (Plan Cache for FOON_to_PDDL):
+----------------------------------------------
+-- Written and maintained by:
+    * David Paulius (dpaulius@cs.brown.edu / davidpaulius@tum.de)
+
+NOTE: this module keeps a local, content-addressed cache of plans found for generated domain and problem files.
+    Files are canonicalized before hashing (i.e., comments, whitespace, letter case, and the order of predicates
+    within conjunctions are ignored), so regenerating the same recipe and kitchen will map to the same cache entry.
+'''
+
+''' License
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with this program. If not, see https://www.gnu.org/licenses/.
+'''
+
+import os
+import re
+import json
+import time
+import shlex
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+# -- default location of the plan cache and the number of plans to keep before evicting the least recently used:
+default_cache_dir = os.path.join(os.path.expanduser('~'), '.foon_plan_cache')
+default_max_entries = 1000
+
+# -- these are the sections whose order does not matter to a planner, so they get sorted when canonicalizing:
+unordered_sections = ['and', ':init']
+
+
+def _tokenize_PDDL(text):
+    # -- remove all comments (anything after ';' on a line) and make everything lowercase, since PDDL is case-insensitive:
+    text = re.sub(r';[^\n]*', '', text).lower()
+    return text.replace('(', ' ( ').replace(')', ' ) ').split()
+#enddef
+
+
+def _parse_PDDL(text):
+    # NOTE: this returns the PDDL definition as nested lists of tokens (i.e., as an S-expression):
+    stack = [[]]
+    for token in _tokenize_PDDL(text):
+        if token == '(':
+            stack.append([])
+        elif token == ')':
+            if len(stack) < 2:
+                raise ValueError('unbalanced parentheses in PDDL definition')
+            expression = stack.pop()
+            stack[-1].append(expression)
+        else:
+            stack[-1].append(token)
+
+    if len(stack) != 1:
+        raise ValueError('unbalanced parentheses in PDDL definition')
+
+    return stack[0]
+#enddef
+
+
+def _canonicalize_PDDL(text):
+    # NOTE: two domain or problem files that only differ in formatting or predicate order will give the same canonical string:
+    def _to_string(expression):
+        if not isinstance(expression, list):
+            return expression
+
+        children = [_to_string(E) for E in expression]
+        if children and children[0] in unordered_sections:
+            children = [children[0]] + sorted(set(children[1:]))
+
+        return '(' + ' '.join(children) + ')'
+
+    return ' '.join([_to_string(E) for E in _parse_PDDL(text)])
+#enddef
+
+
+def _hash_PDDL(text):
+    return hashlib.sha256(_canonicalize_PDDL(text).encode('utf-8')).hexdigest()
+#enddef
+
+
+class PlanCache(object):
+    # NOTE: each entry is a JSON file named after the hash of the domain, problem and planner command;
+    #	the modification time of an entry is used to track when it was last used for LRU eviction.
+
+    def __init__(self, cache_dir=None, max_entries=default_max_entries):
+        self.cache_dir = cache_dir if cache_dir else default_cache_dir
+        self.max_entries = max_entries
+
+        # -- counters for the number of cache hits and misses made with this cache object:
+        self.hits = 0
+        self.misses = 0
+
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+    #enddef
+
+    def getKey(self, domain_text, problem_text, planner_command=''):
+        key = hashlib.sha256()
+        key.update(_hash_PDDL(domain_text).encode('utf-8'))
+        key.update(_hash_PDDL(problem_text).encode('utf-8'))
+        key.update(str(planner_command).encode('utf-8'))
+        return key.hexdigest()
+    #enddef
+
+    def _getEntryPath(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+    #enddef
+
+    def get(self, key):
+        # -- returns a tuple of (plan, statistics) if the key exists in the cache, otherwise None:
+        entry_path = self._getEntryPath(key)
+        try:
+            with open(entry_path, 'r') as entry_file:
+                entry = json.load(entry_file)
+        except (IOError, OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # -- mark this entry as recently used:
+        try:
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return entry['plan'], entry['stats']
+    #enddef
+
+    def put(self, key, plan, stats):
+        # -- write to a temporary file first so that other processes never read a partially written entry:
+        temp_fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(temp_fd, 'w') as entry_file:
+            json.dump({'plan': plan, 'stats': stats}, entry_file)
+        os.replace(temp_path, self._getEntryPath(key))
+
+        self._evict()
+    #enddef
+
+    def _evict(self):
+        entries = [os.path.join(self.cache_dir, E) for E in os.listdir(self.cache_dir) if E.endswith('.json')]
+        if len(entries) <= self.max_entries:
+            return
+
+        # -- remove the least recently used entries until we are within the limit:
+        entries.sort(key=lambda E: os.path.getmtime(E))
+        for E in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(E)
+            except OSError:
+                pass
+    #enddef
+
+    def clear(self):
+        for E in os.listdir(self.cache_dir):
+            if E.endswith('.json'):
+                os.remove(os.path.join(self.cache_dir, E))
+    #enddef
+
+    def getHitRate(self):
+        return (self.hits / float(self.hits + self.misses)) if (self.hits + self.misses) else 0.0
+    #enddef
+
+    def printStatistics(self):
+        print(' -- [FOON_plan_cache] : ' + str(self.hits) + ' hit(s) and ' + str(self.misses) + ' miss(es) (hit rate: '
+              + str(round(self.getHitRate() * 100.0, 1)) + '%)')
+    #enddef
+#endclass
+
+
+def _parse_planner_statistics(output):
+    # NOTE: these patterns match the output of Fast-Downward; other planners will simply report fewer statistics:
+    patterns = {
+        'expanded_states': r'Expanded (\d+) state',
+        'generated_states': r'Generated (\d+) state',
+        'plan_length': r'Plan length: (\d+)',
+        'plan_cost': r'Plan cost: (\d+)',
+        'search_time': r'Search time: ([\d.]+)s',
+    }
+
+    stats = {}
+    for name, pattern in patterns.items():
+        matches = re.findall(pattern, output)
+        if matches:
+            stats[name] = float(matches[-1]) if '.' in matches[-1] else int(matches[-1])
+    return stats
+#enddef
+
+
+def _run_planner(domain_text, problem_text, planner_command, plan_file='sas_plan', timeout=None):
+    # NOTE: planner_command is a command line with '{domain}' and '{problem}' placeholders, for example:
+    #	"python path/to/fast-downward.py --alias seq-opt-lmcut {domain} {problem}"
+    #	the planner runs in a temporary directory, from which the plan file (by default, Fast-Downward's "sas_plan") is read.
+
+    working_dir = tempfile.mkdtemp(prefix='foon_plan_')
+    try:
+        domain_file, problem_file = os.path.join(working_dir, 'domain.pddl'), os.path.join(working_dir, 'problem.pddl')
+        with open(domain_file, 'w') as F:
+            F.write(domain_text)
+        with open(problem_file, 'w') as F:
+            F.write(problem_text)
+
+        command = [T.replace('{domain}', domain_file).replace('{problem}', problem_file) for T in shlex.split(planner_command)]
+
+        start_time = time.time()
+        result = subprocess.run(command, cwd=working_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, timeout=timeout)
+
+        stats = _parse_planner_statistics(result.stdout)
+        stats['planner_time'] = time.time() - start_time
+        stats['return_code'] = result.returncode
+
+        plan = None
+        if os.path.exists(os.path.join(working_dir, plan_file)):
+            with open(os.path.join(working_dir, plan_file), 'r') as F:
+                plan = [line.strip() for line in F if line.strip() and not line.startswith(';')]
+
+        return plan, stats
+
+    finally:
+        shutil.rmtree(working_dir, ignore_errors=True)
+#enddef
+
+
+def _solve_PDDL(domain_text, problem_text, planner_command, cache=None, **kwargs):
+    # NOTE: this returns a tuple of (plan, statistics), where plan is None if no plan was found;
+    #	if a cache is given, plans are looked up before running the planner and only found plans are stored.
+    key = None
+    if cache is not None:
+        key = cache.getKey(domain_text, problem_text, planner_command)
+        cached = cache.get(key)
+        if cached:
+            plan, stats = cached
+            stats['cached'] = True
+            return plan, stats
+
+    plan, stats = _run_planner(domain_text, problem_text, planner_command, **kwargs)
+    stats['cached'] = False
+
+    if cache is not None and plan is not None:
+        cache.put(key, plan, stats)
+
+    return plan, stats
+#enddef
@@ -0,0 +1,148 @@
+from __future__ import print_function
+
+'''
+FOON_startup_benchmark (Startup Time Budget for FOON_to_PDDL):
+--------------------------------------------------------------
+-- Written and maintained by:
+    * David Paulius (dpaulius@cs.brown.edu / davidpaulius@tum.de)
+
+NOTE: this script measures how long FOON_to_PDDL.py takes to import everything it needs on a short run (i.e., --help),
+    using Python's own import profiler ("python -X importtime"), and compares it to the budget stored in
+    FOON_startup_budget.json. It exits with an error code if:
+    1. the import time (best of several fresh interpreters) is over budget, or
+    2. any module that should only be imported when it is needed (e.g., the FOON API or the plan cache) is imported at startup.
+
+    Only modules that a bare interpreter does not already import are counted, so the interpreter's own startup is left out.
+    Since import times depend on the machine, the budget is stored as a ratio to the time taken to import a few standard modules
+    (see reference_command), which is measured in the same run; a slower machine will be slower at both.
+    To run the benchmark (or to store a new budget after an intended change, use --update):
+    >> python FOON_startup_benchmark.py [--runs=10] [--update]
+'''
+
+''' License
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU General Public License as published by the Free Software Foundation, either version 3 of the License, or (at your option) any later version.
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+You should have received a copy of the GNU General Public License along with this program. If not, see https://www.gnu.org/licenses/.
+'''
+
+import sys
+import os
+import json
+import getopt
+import subprocess
+
+path_to_script = os.path.dirname(os.path.abspath(__file__))
+budget_file = os.path.join(path_to_script, 'FOON_startup_budget.json')
+
+# -- the short run that is measured (the script is run as it would be from the command line):
+startup_command = ['FOON_to_PDDL.py', '--help']
+
+# -- a reference run that only imports standard modules, used to scale the budget to the speed of the machine:
+reference_command = ['-c', 'import argparse, json']
+
+# -- the budget is stored with this much headroom over the measured time, since timings vary from one run to another:
+budget_headroom = 1.5
+
+
+def _run_importtime(arguments):
+    # NOTE: this function returns a list of tuples (depth, module, cumulative time in microseconds) for every import,
+    #	where depth is 0 for modules imported directly (rather than by another module).
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + arguments, cwd=path_to_script,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        imports.append((depth, name.strip(), int(cumulative)))
+
+    return imports
+#enddef
+
+
+def _get_import_time(imports, interpreter_modules):
+    return sum(cumulative for depth, module, cumulative in imports if depth == 0 and module not in interpreter_modules)
+#enddef
+
+
+def _measure_startup(runs=10):
+    # NOTE: this function returns a tuple (startup time, reference time, imported modules), where both times are the best of all runs;
+    #	the startup and reference runs take turns, so that both are measured under the same load.
+
+    # -- modules imported by a bare interpreter (e.g., by site) are not counted:
+    interpreter_modules = set(module for _, module, _ in _run_importtime(['-c', 'pass']))
+
+    best_time, best_reference_time, imported_modules = None, None, set()
+    for _ in range(runs):
+        imports = _run_importtime(startup_command)
+        startup_time = _get_import_time(imports, interpreter_modules)
+        reference_time = _get_import_time(_run_importtime(reference_command), interpreter_modules)
+
+        best_time = startup_time if best_time is None else min(best_time, startup_time)
+        best_reference_time = reference_time if best_reference_time is None else min(best_reference_time, reference_time)
+        imported_modules |= set(module for _, module, _ in imports)
+
+    return best_time, best_reference_time, imported_modules
+#enddef
+
+
+def _load_budget():
+    with open(budget_file, 'r') as F:
+        return json.load(F)
+#enddef
+
+
+def _save_budget(budget):
+    with open(budget_file, 'w') as F:
+        json.dump(budget, F, indent=4)
+        F.write('\n')
+#enddef
+
+
+if __name__ == '__main__':
+    runs, update_budget = 10, False
+    try:
+        opts, _ = getopt.getopt(sys.argv[1:], 'h', ['runs=', 'update', 'help'])
+        for opt, arg in opts:
+            if opt == '--runs':
+                runs = int(arg)
+            elif opt == '--update':
+                update_budget = True
+            else:
+                print(' -- usage: python FOON_startup_benchmark.py [--runs=10] [--update]')
+                sys.exit()
+    except getopt.GetoptError:
+        sys.exit()
+
+    budget = _load_budget()
+
+    startup_time, reference_time, imported_modules = _measure_startup(runs)
+    time_ratio = startup_time / float(reference_time)
+    print(" -- [FOON_startup_benchmark] : '" + ' '.join(startup_command) + "' imports in " + str(round(startup_time / 1000.0, 2))
+          + " ms, or " + str(round(time_ratio, 2)) + "x the reference ('" + ' '.join(reference_command[1:]) + "' in " + str(round(reference_time / 1000.0, 2))
+          + ' ms; best of ' + str(runs) + ' runs; budget: ' + str(budget['import_time_ratio']) + 'x).')
+
+    if update_budget:
+        budget['import_time_ratio'] = round(time_ratio * budget_headroom, 2)
+        _save_budget(budget)
+        print("  -- New budget of " + str(budget['import_time_ratio']) + "x the reference saved to '" + os.path.basename(budget_file) + "'.")
+        sys.exit()
+
+    failed = False
+
+    if time_ratio > budget['import_time_ratio']:
+        print('  -- FAILED: Startup is over budget by ' + str(round((time_ratio - budget['import_time_ratio']) * reference_time / 1000.0, 2)) + ' ms!')
+        failed = True
+
+    eager_modules = sorted(set(budget['lazy_modules']) & imported_modules)
+    if eager_modules:
+        print('  -- FAILED: These modules should only be imported when needed: ' + str(eager_modules))
+        failed = True
+
+    if not failed:
+        print('  -- Startup is within budget.')
+
+    sys.exit(1 if failed else 0)
@@ -23,26 +23,45 @@ You should have received a copy of the GNU General Public License along with thi
 
 import sys
 import os
-import getopt
-import random
+import time
+
+import FOON_api_loader as fal
 
 last_updated = '21st March, 2025'
 
-# -- attempt to import the FGA script:
-path_to_FOON_code = os.path.join(os.path.dirname(__file__), './foon_api/')
+class _LazyModule(object):
+    # NOTE: a stand-in for a module that is only imported the first time one of its attributes is used, so that short runs
+    #	(e.g., --help, or converting a graph that was already imported into a database) do not pay for imports they never use.
+    #	Once imported, the stand-in is replaced by the module itself in this script's globals.
+
+    def __init__(self, alias, name=None, import_function=None):
+        self._alias = alias
+        self._name = name
+        self._import_function = import_function
+    #enddef
+
+    def __getattr__(self, attribute):
+        if attribute.startswith('__'):
+            raise AttributeError(attribute)
+
+        if self._import_function:
+            module = self._import_function()
+        else:
+            import importlib
+            module = importlib.import_module(self._name)
+
+        globals()[self._alias] = module
+        return getattr(module, attribute)
+    #enddef
+#endclass
 
-# NOTE: we need to import some files from the FOON API directory:
-if path_to_FOON_code not in sys.path:
-    # -- add the directory to the FOON API scripts to the current path:
-    sys.path.append(path_to_FOON_code)
 
-try:
-    import FOON_graph_analyser as fga
-except ImportError:
-    print(" -- ERROR: Missing 'FOON_graph_analyzer.py'!")
-    print("\t-- Download here: https://github.com/davidpaulius/foon_api")
-    sys.exit()
-#end
+# -- the FOON API scripts are found and imported by FOON_api_loader.py (see _import_FGA()):
+fga = _LazyModule('fga', import_function=fal._import_FGA)
+fpc = _LazyModule('fpc', 'FOON_plan_cache')
+fos = _LazyModule('fos', 'FOON_output_sinks')
+random = _LazyModule('random', 'random')
+heapq = _LazyModule('heapq', 'heapq')
 
 # -- variables for the FOON subgraph file name and a kitchen items file (optional - defaults to creating one with starting nodes)
 FOON_subgraph_file = None
@@ -55,6 +74,16 @@ ingredients_to_ignore = []
 # -- these are the names of the PDDL files that are created from the FOON file:
 FOON_domain_file, FOON_problem_file = None, None
 
+# -- name of the domain used in both domain and problem files:
+PDDL_domain_name = 'universal_FOON'
+
+# NOTE: output_target (optional): this determines where PDDL files are written (see FOON_output_sinks.py):
+#   1. None -- files are written atomically (i.e., a file is only replaced once it has been completely written).
+#   2. '-' -- files are streamed to stdout (and all other messages are printed to stderr).
+#   3. 'gzip' -- files are written atomically and compressed with gzip (with the '.gz' extension).
+#   4. 'memory' -- files are kept in memory (in fos.memory_outputs) rather than written to disk.
+output_target = None
+
 # NOTE: pddl_format takes the value of either:
 #   1. 'OCP' -- this will generate object-centered files for TAMP based on object-centered predicates
 #   2. 'FOON' -- this will generate PDDL files used to replicate task tree retrieval using the given FOON file.
@@ -64,10 +93,69 @@ pddl_format = 'OCP'
 #	if not provided, both files are made regardless.
 file_type = None
 
+# NOTE: experimental!
+# -- compile forced linear chains of functional units into macro-operators (see _find_macro_chains()):
+use_macros = False
+
+# NOTE: export_input_nodes (optional): if True, the starting nodes are also exported to 'FOON-input_only_nodes.txt' using FGA.
+export_input_nodes = False
+
+# -- indices built from the functional units of the loaded FOON (see _build_node_index()):
+#	each maps an object node's key to the set of indices (in fga.FOON_lvl3) of units that consume or produce it.
+object_consumers, object_producers = {}, {}
+
+# -- planner command used to solve generated files (with '{domain}' and '{problem}' placeholders; see FOON_plan_cache.py):
+planner_command = None
+
+# -- directory of the local plan cache (if None, the default directory from FOON_plan_cache.py is used):
+plan_cache_dir = None
+use_plan_cache = True
+
+# -- watch mode: keep converting the FOON file every time it is saved:
+watch_mode = False
+
+# NOTE: watch_state is only used in watch mode (see _watch_FOON()) to keep the actions translated in the last conversion:
+watch_state = None
+
+# NOTE: database_file (optional): an SQLite database (see FOON_database.py) from which subgraphs are streamed during conversion,
+#	which avoids keeping large subgraphs in memory; goal_pruning will only keep units that are needed to make the goal nodes.
+database_file = None
+goal_pruning = False
+
+# -- decompose the problem into a chain of smaller problems using landmarks from the graph (see _create_landmark_problems()):
+use_landmarks = False
+
+# -- check generated files for undeclared symbols, unreachable goals and unused actions (see FOON_PDDL_checker.py):
+check_files = False
+
+# NOTE: batch conversion (see _convert_batch()): a list of subgraph files converted by a pool of worker processes:
+batch_files = []
+num_workers = None
+
+# -- settings that affect how each file in a batch is converted (these are passed to every worker; see _init_batch_worker()):
+batch_settings = ['file_type', 'output_target', 'use_macros', 'check_files', 'FOON_inputs_file', 'ingredients_to_ignore']
+
+# -- text files written by this script, which should never be converted as subgraphs in a batch:
+generated_file_suffixes = ['_macros.txt', 'FOON-input_only_nodes.txt']
+
+# -- these are the physical state of matter that we will care about when parsing FOON graphs:
+state_types = ['whole', 'diced', 'chopped', 'sliced', 'mixed', 'ground', 'juiced', 'spread']
+
+# -- objects where they "contain" items on top of them rather than inside (i.e., they will have "air" on top):
+air_on_objects = ['plate', 'pizza pan', 'cutting board']
+
+# -- these are objects that will be treated as containers:
+ingr_in_objects = []
+
+# -- older table_positions (directly from Alejandro) = ['tablel', 'tablem', 'tabler']
+table_positions = ['table']
+
 def _check_args():
-    global FOON_subgraph_file, pddl_format, file_type
+    global FOON_subgraph_file, pddl_format, file_type, use_macros, planner_command, plan_cache_dir, use_plan_cache, output_target, export_input_nodes, watch_mode, database_file, goal_pruning, check_files, use_landmarks, batch_files, num_workers
+    import getopt
+
     try:
-        opts, _ = getopt.getopt(sys.argv[1:], 'fi:fo:ty:h', ['file=', 'format=', 'type=', 'help'])
+        opts, _ = getopt.getopt(sys.argv[1:], 'fi:fo:ty:h', ['file=', 'export_inputs', 'format=', 'type=', 'output=', 'macros', 'watch', 'planner=', 'plan_cache=', 'no_plan_cache', 'database=', 'prune', 'check', 'landmarks', 'batch=', 'workers=', 'help'])
 
         for opt, arg in opts:
 
@@ -75,6 +163,10 @@ def _check_args():
                 print("  -- File '" + str(arg) + "' will be converted to PDDL.")
                 FOON_subgraph_file = str(arg)
 
+            elif opt == '--export_inputs':
+                export_input_nodes = True
+                print("  -- Starting nodes will be exported to 'FOON-input_only_nodes.txt'.")
+
             elif opt in ('-fo', '--format'):
                 pddl_format = str(arg)
                 print('  -- Using ' + ('object-centered predicates' if pddl_format == 'OCP' else 'FOON-based POs and objects') + '.')
@@ -83,13 +175,88 @@ def _check_args():
                 file_type = int(arg)
                 print('  -- Producing a ' + ('domain' if file_type == 1 else 'problem') + ' file.')
 
+            elif opt == '--output':
+                output_target = str(arg)
+                if output_target not in ['-', 'gzip']:
+                    sys.exit(" -- ERROR: Invalid output provided! Use either '-' for stdout or 'gzip' for compressed files.")
+                print('  -- Writing PDDL files ' + ('to stdout.' if output_target == '-' else 'compressed with gzip.'))
+
+            elif opt == '--macros':
+                use_macros = True
+                print('  -- Compiling linear chains of functional units into macro-operators.')
+
+            elif opt == '--watch':
+                watch_mode = True
+                print('  -- Watching the FOON file for changes.')
+
+            elif opt == '--planner':
+                planner_command = str(arg)
+                print("  -- Generated files will be solved with planner command '" + planner_command + "'.")
+
+            elif opt == '--plan_cache':
+                plan_cache_dir = str(arg)
+                print("  -- Using plan cache found at '" + plan_cache_dir + "'.")
+
+            elif opt == '--no_plan_cache':
+                use_plan_cache = False
+                print('  -- Plan cache will not be used.')
+
+            elif opt == '--database':
+                database_file = str(arg)
+                print("  -- Functional units will be streamed from database '" + database_file + "'.")
+
+            elif opt == '--prune':
+                goal_pruning = True
+                print('  -- Only functional units needed for the goal nodes will be translated.')
+
+            elif opt == '--check':
+                check_files = True
+                print('  -- Generated files will be checked for consistency.')
+
+            elif opt == '--landmarks':
+                use_landmarks = True
+                print('  -- Problem will be decomposed into stages using landmarks.')
+
+            elif opt == '--batch':
+                batch_files = _find_batch_files(str(arg))
+                print('  -- Converting a batch of ' + str(len(batch_files)) + " file(s) matching '" + str(arg) + "'.")
+
+            elif opt == '--workers':
+                num_workers = int(arg)
+                print('  -- Using ' + str(num_workers) + ' worker process(es).')
+
+            elif opt in ('-h', '--help'):
+                _print_usage()
+                sys.exit()
+
             else:
                 pass
     except getopt.GetoptError:
+        _print_usage()
         sys.exit()
 #enddef
 
 
+def _print_usage():
+    print(" -- usage: python FOON_to_PDDL.py --file='example.txt' [options]")
+    print()
+    print('  --file=<file>              FOON subgraph file to convert')
+    print("  --format='OCP'/'FOON'      PDDL format to produce (default: 'OCP')")
+    print('  --type=1/2                 only produce the domain (1) or problem (2) file')
+    print("  --output='-'/'gzip'        stream files to stdout or compress them with gzip")
+    print('  --export_inputs            also export starting nodes to FOON-input_only_nodes.txt')
+    print('  --macros                   compile forced linear chains of units into macro-operators')
+    print('  --check                    check generated files for consistency')
+    print('  --landmarks                decompose the problem into stages using landmarks')
+    print("  --planner='<command>'      solve generated files with a planner ({domain} and {problem} placeholders)")
+    print('  --plan_cache=<dir>         directory of the plan cache (--no_plan_cache to disable it)')
+    print('  --database=<file>          stream functional units from an SQLite database (--prune to keep only units for the goals)')
+    print('  --batch=<dir or pattern>   convert many files in parallel (--workers=<N>)')
+    print('  --watch                    convert the file again every time it is saved')
+    print('  --help                     show this message')
+#enddef
+
+
 def _reviseObjectLabels(S):
     chars_to_remove = ['{}', '{', ',', '}', ' ', '-']
     string = S
@@ -106,6 +273,8 @@ def _reviseObjectLabels(S):
 def _convert_to_PDDL(option, file_type=None, ingredient_dropout=0):
     if option == 'FOON':
         _create_PDDL_FOON(file_type)
+    elif option == 'OCP' and database_file:
+        _create_PDDL_OCP_from_database(file_type, ingredient_dropout=ingredient_dropout)
     elif option == 'OCP':
         _create_PDDL_OCP(file_type, ingredient_dropout=ingredient_dropout)
     else:
@@ -123,6 +292,8 @@ def _create_PDDL_FOON(file_type=None):
         if not FOON_subgraph_file:
             FOON_subgraph_file = input('-- Enter file name and path to the FOON graph to be converted: > ')
 
+        _set_PDDL_file_names()
+
         # NOTE: PDDL conversion to domain needs to be done in the following steps:
         #	1. First, extract all of the object nodes needed to represent the provided FOON.
         #		-- We will have to use an object key (using the FOON classes) to describe each object in a unique way.
@@ -134,80 +305,77 @@ def _create_PDDL_FOON(file_type=None):
         # -- now that we have all functional units read, we can proceed to the annotation phase:
 
         # -- create the file we are going to write to:
-        pddl_file = open(os.path.splitext(FOON_subgraph_file)[0] + '_domain.pddl', 'w')
-
-        pddl_file.write('(define (domain universal_FOON)\n')
-        pddl_file.write('\n')
-        pddl_file.write('(:requirements :adl)\n')
-
-        pddl_file.write('\n')
-
-        # -- at the macro level, we will only have types of "object":
-        pddl_file.write('(:types\n')
-        pddl_file.write('\tobject_node - object\n')
-        pddl_file.write(')\n')
-
-        pddl_file.write('\n')
-
-        # -- write all objects (step 1 from above) as constants (as per suggestions on FD forum):
-        pddl_file.write('(:constants\n')
-        for N in fga.nodes_lvl3:
-            if N.is_objectNode():
-                pddl_file.write('\t' + _reviseObjectLabels(N.getObjectKey()) + ' - object_node\n')
-        pddl_file.write(')\n')
-
-        pddl_file.write('\n')
-
-        # -- write predicates section of file:
-        pddl_file.write('(:predicates\n')
-        pddl_file.write('\t(is_available ?obj - object_node)\n')
-        pddl_file.write(')\n')
-
-        pddl_file.write('\n')
-
-        # -- writing actions section of file:
-        for FU in fga.FOON_lvl3:
-            pddl_file.write('(:action functional_unit_' + str(fga.FOON_lvl3.index(FU)) + '\n')
-            pddl_file.write('\t; description: <' + FU.getWord2VecSentence() + '>\n')
-
-            # NOTE: skip adding parameters and just work on the constants:
-            # {
-                # # -- writing parameters (i.e. input and output objects):
-                # pddl_file.write('\t:parameters (\n')
-                # -- writing input objects:
-                # pddl_file.write('\t\t; -- input objects are as follows:\n')
-                # for x in range(FU.getNumberOfInputs()):
-                # 	pddl_file.write('\t\t?input_' + str(x) + ' - ' + _reviseObjectLabels(FU.getInputList()[x].getObjectKey()) + '\n')
-
-                # # -- writing output objects:
-                # pddl_file.write('\t\t; -- output objects are as follows:\n')
-                # for x in range(FU.getNumberOfOutputs()):
-                # 	pddl_file.write('\t\t?output_' + str(x) + ' - ' + _reviseObjectLabels(FU.getOutputList()[x].getObjectKey()) + '\n')
-                # pddl_file.write('\t)\n')
-            # }
-
-            pddl_file.write('\t:parameters ( )\n')
-
-            pddl_file.write('\t:precondition (and\n')
-            for N in FU.getInputList():
-                pddl_file.write('\t\t(' + 'is_available ' + _reviseObjectLabels(N.getObjectKey()) + ')\n')
-            pddl_file.write('\t)\n')
-
-            pddl_file.write('\t:effect (and\n')
-            for N in FU.getOutputList():
-                pddl_file.write('\t\t(' + 'is_available ' + _reviseObjectLabels(N.getObjectKey()) + ')\n')
-            pddl_file.write('\t)\n')
+        with fos._open_sink(FOON_domain_file, output_target) as pddl_file:
+
+            pddl_file.write('(define (domain universal_FOON)\n')
+            pddl_file.write('\n')
+            pddl_file.write('(:requirements :adl)\n')
+
+            pddl_file.write('\n')
+
+            # -- at the macro level, we will only have types of "object":
+            pddl_file.write('(:types\n')
+            pddl_file.write('\tobject_node - object\n')
+            pddl_file.write(')\n')
 
+            pddl_file.write('\n')
+
+            # -- write all objects (step 1 from above) as constants (as per suggestions on FD forum):
+            pddl_file.write('(:constants\n')
+            for N in fga.nodes_lvl3:
+                if N.is_objectNode():
+                    pddl_file.write('\t' + _reviseObjectLabels(N.getObjectKey()) + ' - object_node\n')
             pddl_file.write(')\n')
 
             pddl_file.write('\n')
 
-        #endfor
+            # -- write predicates section of file:
+            pddl_file.write('(:predicates\n')
+            pddl_file.write('\t(is_available ?obj - object_node)\n')
+            pddl_file.write(')\n')
+
+            pddl_file.write('\n')
+
+            # -- writing actions section of file:
+            for FU in fga.FOON_lvl3:
+                pddl_file.write('(:action functional_unit_' + str(fga.FOON_lvl3.index(FU)) + '\n')
+                pddl_file.write('\t; description: <' + FU.getWord2VecSentence() + '>\n')
+
+                # NOTE: skip adding parameters and just work on the constants:
+                # {
+                    # # -- writing parameters (i.e. input and output objects):
+                    # pddl_file.write('\t:parameters (\n')
+                    # -- writing input objects:
+                    # pddl_file.write('\t\t; -- input objects are as follows:\n')
+                    # for x in range(FU.getNumberOfInputs()):
+                    # 	pddl_file.write('\t\t?input_' + str(x) + ' - ' + _reviseObjectLabels(FU.getInputList()[x].getObjectKey()) + '\n')
 
-        pddl_file.write(')')
+                    # # -- writing output objects:
+                    # pddl_file.write('\t\t; -- output objects are as follows:\n')
+                    # for x in range(FU.getNumberOfOutputs()):
+                    # 	pddl_file.write('\t\t?output_' + str(x) + ' - ' + _reviseObjectLabels(FU.getOutputList()[x].getObjectKey()) + '\n')
+                    # pddl_file.write('\t)\n')
+                # }
+
+                pddl_file.write('\t:parameters ( )\n')
+
+                pddl_file.write('\t:precondition (and\n')
+                for N in FU.getInputList():
+                    pddl_file.write('\t\t(' + 'is_available ' + _reviseObjectLabels(N.getObjectKey()) + ')\n')
+                pddl_file.write('\t)\n')
+
+                pddl_file.write('\t:effect (and\n')
+                for N in FU.getOutputList():
+                    pddl_file.write('\t\t(' + 'is_available ' + _reviseObjectLabels(N.getObjectKey()) + ')\n')
+                pddl_file.write('\t)\n')
+
+                pddl_file.write(')\n')
+
+                pddl_file.write('\n')
+
+            #endfor
 
-        # -- make sure to close the file after writing to it:
-        pddl_file.close()
+            pddl_file.write(')')
 
     def _create_problem_file():
         global FOON_subgraph_file, FOON_inputs_file
@@ -218,6 +386,8 @@ def _create_PDDL_FOON(file_type=None):
         if not FOON_inputs_file:
             FOON_inputs_file = input('-- Enter file name and path to the environment / kitchen items file to be converted: > ')
 
+        _set_PDDL_file_names()
+
         # NOTE: PDDL conversion to problem file needs to be done in the following steps:
         #	1. Read the kitchen items / environment file that will usually be provided to the task tree retrieval algorithm.
         #		-- Each item is listed one by one, where they can be delineated by '//' or other tokens.
@@ -228,46 +398,43 @@ def _create_PDDL_FOON(file_type=None):
         kitchen_items = fga._identifyKitchenItems(FOON_inputs_file)
 
         # -- create the file we are going to write to:
-        pddl_file = open(os.path.splitext(FOON_subgraph_file)[0].replace('_domain', '') + '_problem.pddl', 'w')
-        domain_file = open(FOON_subgraph_file, 'r')
-        domain_lines = domain_file.readlines()
-
-        pddl_file.write(domain_lines[0].replace('domain', 'problem') + '\n')
-        pddl_file.write('\n')
-        pddl_file.write(  domain_lines[0].split('(define ')[1].replace('domain', ':domain') + '\n')
-        pddl_file.write('\n')
+        with fos._open_sink(FOON_problem_file, output_target) as pddl_file:
+            domain_file = open(FOON_subgraph_file, 'r')
+            domain_lines = domain_file.readlines()
 
-        # objects_starting_line = 0
-        # while True:
-        # 	objects_starting_line += 1
-        # 	if '(:types' in domain_lines[objects_starting_line]:
-        # 		objects_starting_line += 1
-        # 		break
+            pddl_file.write(domain_lines[0].replace('domain', 'problem') + '\n')
+            pddl_file.write('\n')
+            pddl_file.write(  domain_lines[0].split('(define ')[1].replace('domain', ':domain') + '\n')
+            pddl_file.write('\n')
 
-        # pddl_file.write(')\n')
-        # pddl_file.write('\n')
+            # objects_starting_line = 0
+            # while True:
+            # 	objects_starting_line += 1
+            # 	if '(:types' in domain_lines[objects_starting_line]:
+            # 		objects_starting_line += 1
+            # 		break
 
-        # NOTE: no need to write objects since we are adopting the constants from the domain file:
-        # # -- write all objects (step 1 from above):
-        # pddl_file.write('(:objects\n')
-        # while ')' not in domain_lines[objects_starting_line]:
-        # 	object_line = domain_lines[objects_starting_line].split(' - ')
-        # 	pddl_file.write(object_line[0] + ' - ' + object_line[0].replace('\t', '') + '\n')
-        # 	objects_starting_line += 1
+            # pddl_file.write(')\n')
+            # pddl_file.write('\n')
 
-        # pddl_file.write(')\n')
+            # NOTE: no need to write objects since we are adopting the constants from the domain file:
+            # # -- write all objects (step 1 from above):
+            # pddl_file.write('(:objects\n')
+            # while ')' not in domain_lines[objects_starting_line]:
+            # 	object_line = domain_lines[objects_starting_line].split(' - ')
+            # 	pddl_file.write(object_line[0] + ' - ' + object_line[0].replace('\t', '') + '\n')
+            # 	objects_starting_line += 1
 
-        pddl_file.write('(:init' + '\n')
-        for item in kitchen_items:
-            pddl_file.write('\t' + '(is_available ' + _reviseObjectLabels(item.getObjectKey()) + ')\n')
+            # pddl_file.write(')\n')
 
-        pddl_file.write(')\n')
-        pddl_file.write('\n')
+            pddl_file.write('(:init' + '\n')
+            for item in kitchen_items:
+                pddl_file.write('\t' + '(is_available ' + _reviseObjectLabels(item.getObjectKey()) + ')\n')
 
-        pddl_file.write(')')
+            pddl_file.write(')\n')
+            pddl_file.write('\n')
 
-        # -- make sure to close the file after writing to it:
-        pddl_file.close()
+            pddl_file.write(')')
 
     if file_type == 1:
         _create_domain_file()
@@ -280,21 +447,824 @@ def _create_PDDL_FOON(file_type=None):
 #enddef
 
 
+def _translate_functional_unit_OCP(FU):
+    # NOTE: this function translates a single functional unit into the predicates of its planning operator (PO);
+    #	it returns the PO name (without its index), the preconditions, and the effects (split into new, unchanged and negated predicates).
+
+    # -- list of objects that should be ignored when repeating predicates from preconditions:
+    objects_to_ignore = []
+
+    # -- creating name for planning operators (PO) based on FOON action label and objects:
+    PO_name = str(FU.getMotion().getMotionLabel())
+    for N in range(FU.getNumberOfInputs()):
+        # -- finding the active or focal object based on the action label:
+        focal_object = ''
+        if not FU.getInputNodes()[N].hasIngredients():
+            if PO_name in ['pick-and-place', 'pour', 'sprinkle', 'insert'] and FU.getInputDescriptor(N) == 1:
+                # -- 'pick-and-place' and 'pour' are done on an object with motion descriptor 1:
+                focal_object = FU.getInputNodes()[N].getObjectLabel()
+            elif PO_name in ['slice', 'dice', 'chop', 'cut', 'scoop', 'scoop and pour'] and FU.getInputDescriptor(N) == 0:
+                # -- object being acted upon with the above labels will have a motion descriptor 0:
+                focal_object = FU.getInputNodes()[N].getObjectLabel()
+
+        elif PO_name == 'mix' or PO_name == 'stir':
+            focal_object = 'ingredients'
+
+        if focal_object:
+            PO_name += '_' + focal_object
+            break
+
+    preconditions = []
+    for N in FU.getInputList():
+        # -- position_specified: flag to check if there were any object-centered information assigned to object node:
+        position_specified = False
+
+        # -- review all states in an object node:
+        for S in N.getStatesList():
+            if S[1] in ['in', 'on', 'under'] and bool(S[2]):
+                # -- get the corresponding labels:
+                oc_relation, this_obj, relative_obj = str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), str(_reviseObjectLabels(S[2]))
+                position_specified = True
+
+                if S[2] == 'nothing': relative_obj = 'air'
+
+                if relative_obj == 'air':
+                    if oc_relation in ['under']:
+                        oc_relation = 'on'
+                        this_obj, relative_obj = relative_obj, this_obj
+                    else:
+                        continue
+
+                statement = [oc_relation, relative_obj, this_obj]
+
+                # -- handling containers which "hold" things on top of it (viz. cutting board):
+                if S[2] in ingr_in_objects:
+                    statement[0] = 'in'
+
+                # -- append predicate to the list of precondition predicates for this planning operator:
+                preconditions.append(statement)
+                if S[1] == 'on' and relative_obj != 'air': # if S[1] in ['in', 'on']:
+                    preconditions.append( ['under', this_obj, relative_obj] )
+
+                # -- check if there are any other states existing that required the relative object's name:
+                for pred in preconditions:
+                    if 'LOC' in pred:
+                        pred[pred.index('LOC')] = relative_obj
+
+            # if S[1] in ['empty']:
+            #     # -- emptiness is described by the object concept "air":
+            #     preconditions.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), 'air'] )
+
+            # if 'contains' in S[1]:
+            #     for I in N.getIngredients():
+            #         preconditions.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), _reviseObjectLabels(I)] )
+
+            if S[1] in state_types:
+                if S[1] == 'mixed':
+                    # -- assumption: if something is mixed, then on the *lower* level, the container can be seen as a target for stirring to occur.
+                    #		therefore, we got to find out where the object is located to then make changes to it later.
+                    preconditions.append(['is-mixed', 'LOC', None])
+                    #effects.append(['is-mixed', str(_reviseObjectLabels(N.getObjectLabel())), None])
+                else:
+                    # -- else, just treat other types of structural states differently:
+                    preconditions.append( ['is-'+ str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), None] )
+
+        # -- if no position is specified explicitly, then we can assume that the objects are on the work surface:
+        if not position_specified:
+            # -- for now, let's randomly assign certain objects to different parts of the table (i.e., table_m, table_l, or table_r):
+            table_part = table_positions[int(random.random() * len(table_positions))]
+
+            preconditions.append( ['under', str(_reviseObjectLabels(N.getObjectLabel())), table_part] )
+            preconditions.append( ['on', table_part, str(_reviseObjectLabels(N.getObjectLabel()))] )
+
+    # -- remove any duplicate preconditions (turn lists to tuples then back again):
+    preconditions = [list(y) for y in set([tuple(x) for x in preconditions])]
+
+    effects = []
+    for N in FU.getOutputList():
+        # -- position_specified: flag to check if there were any object-centered information assigned to object node:
+        position_specified = False
+
+        # -- review all states in an object node:
+        for S in N.getStatesList():
+            if S[1] in ['in', 'on', 'under'] and bool(S[2]):
+                # -- get the corresponding labels:
+                oc_relation, this_obj, relative_obj = str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), str(_reviseObjectLabels(S[2]))
+                position_specified = True
+
+                if S[2] == 'nothing': relative_obj = 'air'
+
+                if relative_obj == 'air':
+                    if oc_relation in ['under']:
+                        oc_relation = 'on'
+                        this_obj, relative_obj = relative_obj, this_obj
+                    else:
+                        continue
+
+                statement = [oc_relation, relative_obj, this_obj]
+
+                # -- handling containers which "hold" things on top of it (viz. cutting board):
+                if S[2] in ingr_in_objects:
+                    statement[0] = 'in'
+
+                # -- append predicate to the list of effect predicates for this planning operator:
+                effects.append(statement)
+                if S[1] == 'on': # if S[1] in ['in', 'on']:
+                    effects.append( ['under', this_obj, relative_obj] )
+
+                # -- check if there are any other states existing that required the relative object's name:
+                for pred in effects:
+                    if 'LOC' in pred:
+                        pred[pred.index('LOC')] = relative_obj
+
+            # if S[1] in ['empty']:
+            #     # -- emptiness is described by the object concept "air":
+            #     effects.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), 'air'] )
+
+            # if 'contains' in S[1]:
+            #     for I in N.getIngredients():
+            #         effects.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), _reviseObjectLabels(I)] )
+
+            if S[1] in state_types:
+                if S[1] == 'mixed':
+                    # -- assumption: if something is mixed, then on the *lower* level, the container can be seen as a target for stirring to occur.
+                    #		therefore, we got to find out where the object is located to then make changes to it later.
+                    effects.append(['is-mixed', 'LOC', None])
+                    #effects.append(['is-mixed', str(_reviseObjectLabels(N.getObjectLabel())), None])
+                else:
+                    # -- else, just treat other types of structural states differently:
+                    effects.append( ['is-'+ str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), None] )
+
+        # -- if no position is specified explicitly, then we can assume that the objects are on the work surface:
+        if not position_specified:
+            if FU.getMotion().getMotionLabel() == 'scoop':
+                if FU.getMotionDescriptor(FU.getOutputNodes().index(N), is_input=False) == 1 and N.hasIngredients():
+                    # -- if we are scooping, then the object would actually be in the hand and not the table:
+                    objects_to_ignore.append(N.getObjectLabel())
+            else:
+                table_part = table_positions[int(random.random() * len(table_positions))]
+
+                effects.append( ['under', str(_reviseObjectLabels(N.getObjectLabel())), table_part] )
+                effects.append( ['on', table_part, str(_reviseObjectLabels(N.getObjectLabel()))] )
+
+    # -- remove any duplicate effects (turn lists to tuples then back again):
+    preconditions = [list(y) for y in set([tuple(x) for x in preconditions])]
+
+    parsed_effects = []
+    for predicate in effects:
+        # -- checking for any effects that are not in preconditions (new effects) as well as removing duplicates:
+        if predicate not in preconditions and predicate not in parsed_effects:
+            parsed_effects.append(predicate)
+
+    # NOTE: we are searching for any predicates that may exist in both preconditions and effects:
+    unchanged_preconditions = []
+    for predicate in preconditions:
+        if predicate in effects:
+            unchanged_preconditions.append(predicate)
+
+    # negated_preconditions = []
+    # for predicate_1 in parsed_effects:
+    #     for predicate_2 in unchanged_preconditions:
+    #         # -- checking for partial overlap for negation of states:
+    #         if predicate_1[0] == predicate_2[0] and predicate_1[1] == predicate_2[1] and predicate_1[2] != predicate_2[2]:
+    #             # -- looking for any evidence of changes:
+    #             add_to_negation = False
+
+    #             if predicate_2[0] == 'under' and predicate_2[2] == 'table':
+    #                 # -- in the case of an object that used to be on the table,
+    #                 #       we need to negate that predicate:
+    #                 add_to_negation = True
+
+    #             # NOTE: checking if ingredients have been transferred in some way:
+    #             if not add_to_negation:
+
+    #                 for N in FU.getOutputList():
+    #                     if 'air' in predicate_2:
+    #                         if N.getObjectLabel() == predicate_2[1].replace('_', ' ') and len(N.getIngredients()) > 0:
+    #                             # -- intuition :- if an object was seen as empty (i.e., has "air") but now it has ingredients,
+    #                             #       then we need to check if that object now contains at least ingredient:
+    #                             add_to_negation = True
+
+    #                     elif N.getObjectLabel() == predicate_2[2].replace('_', ' ') and predicate_2[1].replace('_', ' ') not in N.getIngredients():
+    #                         # -- intuition :- if an object was under something before,
+    #                         #       we check if there is evidence that the object is no longer under that object
+    #                         #           (e.g., the container is empty or no longer contains that object)
+    #                         add_to_negation = True
+
+    #                     if add_to_negation:
+    #                         break
+
+    #             if add_to_negation:
+    #                 negated_preconditions.append(predicate_2)
+    #                 unchanged_preconditions.remove(predicate_2)
+
+    #         elif predicate_1[0] != predicate_2[0] and predicate_1[0] in ['on', 'under'] and predicate_2[0] in ['on', 'under']:
+    #             # -- maybe there is a predicate that indicates some other state change for something else:
+    #             if predicate_1[1] == predicate_2[2] and predicate_1[2] == predicate_2[1]:
+    #                 # -- state-wise negation:
+    #                 negated_preconditions.append(predicate_2)
+    #                 unchanged_preconditions.remove(predicate_2)
+
+    #         elif predicate_1[0] != predicate_2[0] and predicate_1[1] == predicate_2[1] and predicate_1[2] == predicate_2[2]:
+    #             # -- state-wise negation:
+    #             negated_preconditions.append(predicate_2)
+    #             unchanged_preconditions.remove(predicate_2)
+
+    negated_preconditions = []
+    for predicate in preconditions:
+        if predicate not in parsed_effects and predicate not in unchanged_preconditions:
+            negated_preconditions.append(predicate)
+
+    return _reviseObjectLabels(PO_name), preconditions, parsed_effects, unchanged_preconditions, negated_preconditions
+#enddef
+
+
+def _write_OCP_action(pddl_file, action_name, description, preconditions, parsed_effects, unchanged_preconditions, negated_preconditions):
+    # NOTE: this function writes a single planning operator using the predicates from _translate_functional_unit_OCP():
+    pddl_file.write('(:action ' + action_name + '\n')
+
+    pddl_file.write('\t; description: <' + description + '>\n')
+
+    pddl_file.write('\t:parameters ( )\n')
+
+    # -- preconditions: all input nodes and their initial states before an action is executed
+    pddl_file.write('\t:precondition (and\n')
+
+    # NOTE: dropped predicates are those containing references to objects we want removed from the recipe:
+    dropped_predicates = []
+    for predicate in preconditions:
+        # -- if a predicate contains an ingredient that needs to be ignored, then we comment it out:
+        if bool(set(predicate) & set(ingredients_to_ignore)):
+            dropped_predicates.append(predicate)
+        else:
+            pddl_file.write('\t\t(' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ')\n')
+
+    # -- some objects can be dropped (i.e., simply commented out) from the PDDL file:
+    if dropped_predicates:
+        pddl_file.write('\n\t\t; NOTE: the following predicates were removed due to ingredient dropout:\n')
+        for predicate in dropped_predicates:
+            pddl_file.write('\t\t; (' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ')\n')
+
+    pddl_file.write('\t)\n')
+
+    # -- preconditions: all output nodes and their initial states after an action is executed
+    pddl_file.write('\t:effect (and\n')
+
+    pddl_file.write('\t\t; new effects of executing this functional unit:\n')
+    for predicate in parsed_effects:
+        pddl_file.write('\t\t(' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ')\n')
+
+    if unchanged_preconditions:
+        pddl_file.write('\n\t\t; preconditions that did not get changed in some way:\n')
+        for predicate in unchanged_preconditions:
+            #if len(set(objects_to_ignore) & set(predicate)) == 0: # -- uncomment this to ignore return to table for some objects
+            pddl_file.write('\t\t(' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ')\n')
+
+    if negated_preconditions:
+        pddl_file.write('\n\t\t; negated preconditions:\n')
+        for predicate in negated_preconditions:
+            pddl_file.write('\t\t(not (' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ') )\n')
+
+    pddl_file.write('\t)\n')
+
+    pddl_file.write(')\n')
+
+    pddl_file.write('\n')
+#enddef
+
+
+def _build_node_index():
+    # NOTE: this function indexes the functional units of the loaded FOON by the object nodes they consume and produce,
+    #	and it returns the starting nodes (i.e., object nodes that are never seen as outputs) in the order they were first seen.
+    global object_consumers, object_producers
+
+    object_consumers, object_producers = {}, {}
+
+    input_nodes = []
+    for index, FU in enumerate(fga.FOON_lvl3):
+        for N in FU.getInputList():
+            if N.getObjectKey() not in object_consumers:
+                input_nodes.append(N)
+            object_consumers.setdefault(N.getObjectKey(), set()).add(index)
+
+        for N in FU.getOutputList():
+            object_producers.setdefault(N.getObjectKey(), set()).add(index)
+
+    # -- starting nodes have an in-degree of zero (i.e., no functional unit produces them):
+    return [N for N in input_nodes if N.getObjectKey() not in object_producers]
+#enddef
+
+
+def _get_changed_nodes(nodes, other_nodes):
+    # -- returns the nodes that are not also found in other_nodes (i.e., the objects of a unit that are not left unchanged):
+    other_keys = set(N.getObjectKey() for N in other_nodes)
+    return [N for N in nodes if N.getObjectKey() not in other_keys]
+#enddef
+
+
+def _find_macro_chains():
+    # NOTE: a forced linear chain is a sequence of functional units where a unit's outputs are consumed by the next unit before any other,
+    #	and the next unit's inputs are only ever produced by that unit (i.e., no other unit can take place in between them).
+    #	Each chain is returned as a list of tuples (index, translation), where translation comes from _translate_functional_unit_OCP().
+
+    # -- link a unit to its successor only if the link is forced in both directions:
+    successor = {}
+    for index, FU in enumerate(fga.FOON_lvl3):
+        # -- goal nodes should still be reachable on their own, so a unit producing a goal will end a chain:
+        if any(N.isGoal for N in FU.getOutputList()):
+            continue
+
+        # -- objects that a unit leaves unchanged (e.g., a knife on the table, which is both an input and an output)
+        #	can be used by any other unit at any time, so they do not count as branching:
+        next_units = set()
+        for N in _get_changed_nodes(FU.getOutputList(), FU.getInputList()):
+            next_units |= object_consumers.get(N.getObjectKey(), set())
+        next_units.discard(index)
+
+        # -- a unit's outputs may also be used by later units (e.g., an ingredient poured into a glass is only mixed at the end);
+        #	the next unit is forced if every other unit using these outputs also needs the next unit's own outputs (i.e., comes after it):
+        next_candidates = []
+        for candidate in next_units:
+            later_units = set()
+            for N in _get_changed_nodes(fga.FOON_lvl3[candidate].getOutputList(), fga.FOON_lvl3[candidate].getInputList()):
+                later_units |= object_consumers.get(N.getObjectKey(), set())
+            if next_units - {candidate} <= later_units:
+                next_candidates.append(candidate)
+
+        if len(next_candidates) != 1:
+            continue
+
+        next_index = next_candidates[0]
+
+        previous_units = set()
+        for N in _get_changed_nodes(fga.FOON_lvl3[next_index].getInputList(), fga.FOON_lvl3[next_index].getOutputList()):
+            previous_units |= object_producers.get(N.getObjectKey(), set())
+        previous_units.discard(next_index)
+
+        if previous_units == {index}:
+            successor[index] = next_index
+    #endfor
+
+    macro_chains, visited = [], set()
+
+    # -- follow each chain from its head (i.e., a unit that is not the successor of any other unit);
+    #	any units that are left over form a cycle, which we break at the unit that comes first in the subgraph:
+    for head in sorted(set(successor) - set(successor.values())) + sorted(successor):
+        if head in visited:
+            continue
+
+        index = head
+        segment, composed = [], None
+        while index is not None and index not in visited:
+            visited.add(index)
+
+            translation = _translate_functional_unit_OCP(fga.FOON_lvl3[index])
+            unit_predicates = _get_unit_predicates(translation)
+
+            if composed is not None:
+                composed = _compose_predicates(composed, unit_predicates)
+
+            if composed is None:
+                # -- a unit cannot follow the chain so far if it needs a predicate that was negated earlier,
+                #	so we close the current segment and start a new one from this unit:
+                if len(segment) > 1:
+                    macro_chains.append(segment)
+                segment, composed = [], unit_predicates
+
+            segment.append((index, translation))
+            index = successor.get(index)
+        #endwhile
+
+        if len(segment) > 1:
+            macro_chains.append(segment)
+    #endfor
+
+    return macro_chains
+#enddef
+
+
+def _get_unit_predicates(translation):
+    # -- predicates are folded as (preconditions, additions, deletions), where unchanged preconditions are kept as additions:
+    return [tuple(x) for x in translation[1]], [tuple(x) for x in translation[2] + translation[3]], [tuple(x) for x in translation[4]]
+#enddef
+
+
+def _compose_predicates(first, second):
+    # NOTE: this function composes the predicates of two planning operators executed one after the other;
+    #	each operator is given as (preconditions, additions, deletions), and None is returned if they cannot be composed.
+    first_pre, first_add, first_del = first
+    second_pre, second_add, second_del = second
+
+    if any(P in first_del for P in second_pre):
+        return None
+
+    preconditions = first_pre + [P for P in second_pre if P not in first_add and P not in first_pre]
+    additions = [P for P in first_add if P not in second_del] + [P for P in second_add if P not in first_add]
+    deletions = [P for P in first_del if P not in second_add] + [P for P in second_del if P not in first_del]
+
+    return preconditions, additions, deletions
+#enddef
+
+
+def _get_macro_name(chain):
+    return 'macro_' + '_'.join([str(index) for index, _ in chain])
+#enddef
+
+
+def _write_OCP_macro_action(pddl_file, chain):
+    # NOTE: this function writes a macro-operator that has the same effect as all functional units in a chain from _find_macro_chains():
+    composed = _get_unit_predicates(chain[0][1])
+    for _, translation in chain[1:]:
+        composed = _compose_predicates(composed, _get_unit_predicates(translation))
+
+    preconditions, additions, deletions = composed
+
+    # -- sort the composed effects in the same way as single planning operators:
+    parsed_effects = [list(P) for P in additions if P not in preconditions]
+    unchanged_preconditions = [list(P) for P in additions if P in preconditions]
+    negated_preconditions = [list(P) for P in deletions]
+
+    description = 'macro of ' + ', '.join([translation[0] + '_' + str(index) for index, translation in chain])
+
+    _write_OCP_action(pddl_file, _get_macro_name(chain), description, [list(P) for P in preconditions], parsed_effects, unchanged_preconditions, negated_preconditions)
+#enddef
+
+
+def _write_macro_table(file_name, macro_chains):
+    # NOTE: each line of the expansion table is tab-separated, where the first entry is the name of the macro-operator
+    #	and the rest are the names of the planning operators (in order) that it stands for.
+    with fos._open_sink(file_name, 'memory' if output_target == 'memory' else None) as table_file:
+        for chain in macro_chains:
+            table_file.write(_get_macro_name(chain) + '\t' + '\t'.join([translation[0] + '_' + str(index) for index, translation in chain]) + '\n')
+#enddef
+
+
+def _load_macro_table(file_name):
+    macro_table = {}
+    for line in open(file_name, 'r'):
+        parts = line.strip().split('\t')
+        if len(parts) > 1:
+            macro_table[parts[0].lower()] = parts[1:]
+    return macro_table
+#enddef
+
+
+def _expand_macro_plan(plan, macro_table):
+    # NOTE: plans can be given as a list of action names or as lines from a plan file (e.g., "(macro_0_1 )" from Fast-Downward);
+    #	any macro-operator is replaced by the functional units it was compiled from, which can then be executed one by one.
+    expanded_plan = []
+    for step in plan:
+        step = step.strip()
+        if not step or step.startswith(';'):
+            continue
+
+        action = step.strip('()').split()[0]
+        if action.lower() in macro_table:
+            expanded_plan.extend(macro_table[action.lower()])
+        else:
+            expanded_plan.append(action)
+
+    return expanded_plan
+#enddef
+
+
+def _translate_object_node_OCP(N, predicates):
+    # NOTE: this function translates the states of an object node into object-centered predicates, which are added to the list "predicates";
+    #	the list is shared across nodes since a predicate for a 'mixed' state is completed by the next location that is found (i.e., 'LOC').
+
+    # -- position_specified: flag to check if there were any object-centered information assigned to object node:
+    position_specified = False
+
+    # -- review all states in an object node:
+    for S in N.getStatesList():
+        if S[1] in ['in', 'on', 'under'] and bool(S[2]):
+            # -- get the corresponding labels:
+            oc_relation, this_obj, relative_obj = str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), str(_reviseObjectLabels(S[2]))
+            position_specified = True
+
+            if S[2] == 'nothing': relative_obj = 'air'
+
+            if relative_obj == 'air':
+                if oc_relation in ['under']:
+                    oc_relation = 'on'
+                    this_obj, relative_obj = relative_obj, this_obj
+                else:
+                    continue
+
+            predicates.append( [oc_relation, relative_obj, this_obj] )
+            if S[1] == 'on' and relative_obj != 'air': # if S[1] in ['in', 'on']:
+                predicates.append( ['under', this_obj, relative_obj] )
+
+            # -- check if there are any other states existing that required the relative object's name:
+            for pred in predicates:
+                if 'LOC' in pred:
+                    pred[pred.index('LOC')] = relative_obj
+
+        # if S[1] in ['empty']:
+        #     # -- emptiness is described by the object concept "air":
+        #     predicates.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), 'air'] )
+
+        # if S[1] == 'contains':
+        #     for I in N.getIngredients():
+        #         predicates.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), _reviseObjectLabels(I)] )
+
+        if S[1] in state_types:
+            if S[1] == 'mixed':
+                # -- assumption: if something is mixed, then on the *lower* level, the container can be seen as a target for stirring to occur.
+                #		therefore, we got to find out where the object is located to then make changes to it later.
+                predicates.append(['is-mixed', 'LOC', None])
+            else:
+                # -- else, just treat other types of structural states differently:
+                predicates.append( ['is-'+ str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), None] )
+
+    # -- if no position is specified explicitly, then we can assume that the objects are on the work surface:
+    if not position_specified:
+        # -- for now, let's randomly assign certain objects to different parts of the table (i.e., table_m, table_l, or table_r):
+        table_part = table_positions[int(random.random() * len(table_positions))]
+
+        predicates.append( ['under', str(_reviseObjectLabels(N.getObjectLabel())), table_part] )
+        predicates.append( ['on', table_part, str(_reviseObjectLabels(N.getObjectLabel()))] )
+    #endif
+#enddef
+
+
+def _parse_fact(fact):
+    # -- facts can be given as strings (e.g., '(on table cup)') or as lists/tuples (e.g., ['on', 'table', 'cup']):
+    if isinstance(fact, str):
+        fact = fact.strip().strip('()').split()
+    fact = tuple(fact)
+    return fact + (None,) * (3 - len(fact)) if len(fact) < 3 else fact
+#enddef
+
+
+class ProblemState(object):
+    # NOTE: a problem state keeps the problem's initial state as an indexed fact store, so that it can be updated during execution
+    #	(e.g., when an object is moved or an ingredient is added) without having to regenerate the problem from a kitchen file.
+    #	Each update costs time proportional to the number of facts that change, since each fact is rendered only once
+    #	and is indexed by the objects it mentions; the changes since the last write can be retrieved with popChanges().
+
+    def __init__(self, init_facts=None, goal_facts=None, domain_name=None):
+        self.domain_name = domain_name if domain_name else PDDL_domain_name
+
+        # -- facts are kept in insertion order, mapping each fact (as a tuple) to its PDDL string:
+        self.facts = {}
+
+        # -- index of all facts that mention an object:
+        self.object_index = {}
+
+        self.goals = {}
+        for fact in (goal_facts if goal_facts else []):
+            fact = _parse_fact(fact)
+            self.goals[fact] = self._render(fact)
+
+        # -- translations of functional units (by index in fga.FOON_lvl3) that were applied to this state:
+        self.unit_translations = {}
+
+        # -- facts that were added or deleted since the last time changes were popped:
+        self.added, self.deleted = set(), set()
+
+        for fact in (init_facts if init_facts else []):
+            self.addFact(fact)
+        self.added = set()
+    #enddef
+
+    def _render(self, fact):
+        return '(' + fact[0] + ' ' + str(fact[1]) + (str(' ' + fact[2]) if fact[2] and len(fact) > 2 else '') + ')'
+    #enddef
+
+    def hasFact(self, fact):
+        return _parse_fact(fact) in self.facts
+    #enddef
+
+    def getFacts(self, obj=None):
+        # -- return all facts, or only those that mention a given object (read from the index, so only those facts are visited):
+        if obj is None:
+            return list(self.facts)
+        return sorted(self.object_index.get(_reviseObjectLabels(obj), set()), key=str)
+    #enddef
+
+    def addFact(self, fact):
+        fact = _parse_fact(fact)
+        if fact in self.facts:
+            return False
+
+        self.facts[fact] = self._render(fact)
+        for obj in fact[1:]:
+            if obj:
+                self.object_index.setdefault(obj, set()).add(fact)
+
+        if fact in self.deleted:
+            self.deleted.discard(fact)
+        else:
+            self.added.add(fact)
+        return True
+    #enddef
+
+    def deleteFact(self, fact):
+        fact = _parse_fact(fact)
+        if fact not in self.facts:
+            return False
+
+        del self.facts[fact]
+        for obj in fact[1:]:
+            if obj:
+                self.object_index[obj].discard(fact)
+
+        if fact in self.added:
+            self.added.discard(fact)
+        else:
+            self.deleted.add(fact)
+        return True
+    #enddef
+
+    def update(self, add=None, delete=None):
+        # -- deletions are done before additions, following the usual semantics of PDDL effects:
+        for fact in (delete if delete else []):
+            self.deleteFact(fact)
+        for fact in (add if add else []):
+            self.addFact(fact)
+    #enddef
+
+    def applyFunctionalUnits(self, completed_units):
+        # NOTE: completed units can be given as indices in fga.FOON_lvl3, or as action names from a plan
+        #	(e.g., 'pour_water_1' or 'macro_0_1', where the trailing numbers are the indices of the units).
+        #	Since PDDL is case-insensitive, planners may print action names in upper case (e.g., 'MACRO_0_1').
+        for unit in completed_units:
+            if isinstance(unit, int):
+                indices = [unit]
+            elif unit.strip('( )').lower().startswith('macro_'):
+                indices = [int(X) for X in unit.strip('( )').split('_')[1:]]
+            else:
+                indices = [int(unit.strip('( )').rsplit('_', 1)[1])]
+
+            for index in indices:
+                if index not in self.unit_translations:
+                    self.unit_translations[index] = _translate_functional_unit_OCP(fga.FOON_lvl3[index])
+
+                _, _, parsed_effects, unchanged_preconditions, negated_preconditions = self.unit_translations[index]
+                self.update(add=parsed_effects + unchanged_preconditions, delete=negated_preconditions)
+    #enddef
+
+    def popChanges(self):
+        # -- returns the facts that were added and deleted since the last call (or since the last time the problem was written):
+        added, deleted = sorted(self.added, key=str), sorted(self.deleted, key=str)
+        self.added, self.deleted = set(), set()
+        return added, deleted
+    #enddef
+
+    def writeProblem(self, file_name, target=None):
+        with fos._open_sink(file_name, target) as pddl_file:
+            if ingredients_to_ignore:
+                # -- write the list of dropped ingredients to the problem file:
+                pddl_file.write('; NOTE: the following ingredients will be dropped:\n')
+                pddl_file.write(';\t' + str(ingredients_to_ignore) + '\n')
+
+            # -- use the same domain name as the domain file for defining this problem:
+            pddl_file.write('(define (problem ' + self.domain_name + ')\n\n')
+            pddl_file.write('(:domain ' + self.domain_name + ')\n\n')
+
+            pddl_file.write('(:init' + '\n')
+            pddl_file.write(''.join(['\t' + line + '\n' for line in self.facts.values()]))
+            pddl_file.write(')\n')
+            pddl_file.write('\n')
+
+            pddl_file.write('(:goal (and\n')
+            for fact in self.goals:
+                # -- if there were some ingredients we wanted to drop, then we drop them also from the goal:
+                if bool(set(fact) & set(ingredients_to_ignore)):
+                    continue
+                pddl_file.write('\t' + self.goals[fact] + '\n')
+            pddl_file.write('))\n')
+
+            pddl_file.write('\n)')
+
+        self.added, self.deleted = set(), set()
+    #enddef
+#endclass
+
+
+def _build_problem_state(kitchen_items, goal_nodes=None):
+    # -- translate the kitchen items (for the initial state) and the goal nodes (by default, those of the loaded FOON) into a problem state:
+    initiation_set = []
+    for N in kitchen_items:
+        _translate_object_node_OCP(N, initiation_set)
+
+    if goal_nodes is None:
+        # -- make sure we look only at object nodes (as motion nodes are also in this list) and the object node must be a goal:
+        goal_nodes = [N for N in fga.FOON_nodes[2] if isinstance(N, fga.FOON.Object) and N.isGoal]
+
+    goal_set = []
+    for N in goal_nodes:
+        _translate_object_node_OCP(N, goal_set)
+
+    return ProblemState(init_facts=initiation_set, goal_facts=goal_set)
+#enddef
+
+
+def _select_dropout_ingredients(ingredient_dropout):
+    # NOTE: this function randomly selects the ingredients (from the list ingredients_to_ignore) that will be dropped,
+    #	where ingredient_dropout is either 1 (no more than half of the ingredients) or 2 (all but one ingredient).
+    # NOTE: the intuition here is to randomly drop a certain number of ingredients from
+    #   preconditions of generated planning operators!
+
+    # -- we will randomly decide on the number of ingredients to drop out, which could be either:
+    if ingredient_dropout == 1:
+        #  1) no more than half of the required ingredients.
+        num_dropout = random.randint(1, round(len(ingredients_to_ignore) / 2.0))
+    else:
+        #  2 no more than all but one ingredient left:
+        num_dropout = random.randint(1, int(len(ingredients_to_ignore) - 1))
+    #endif
+
+    # -- now we create our ingredient "black list" by randomly popping ingredients
+    #       until we are left with the number of ingredients we wish to drop:
+    while len(ingredients_to_ignore) > num_dropout:
+        ingredients_to_ignore.pop( random.randint(0, len(ingredients_to_ignore) - 1) )
+    #endfor
+#enddef
+
+
+def _write_OCP_domain_header(pddl_file, object_types):
+    # NOTE: this function writes everything in an OCP domain file that comes before the actions (i.e., constants and predicates):
+    if ingredients_to_ignore:
+        for X in range(len(ingredients_to_ignore)):
+            ingredients_to_ignore[X] = _reviseObjectLabels(ingredients_to_ignore[X])
+
+        # -- print the list of ingredients that are removed to the terminal...
+        print('  -- NOTE: The following ingredients will be dropped: ' + str(ingredients_to_ignore))
+
+        # ... and also write a comment about it in the domain file:
+        pddl_file.write('; NOTE: the following ingredients will be dropped:\n')
+        pddl_file.write(';\t' + str(ingredients_to_ignore) + '\n')
+
+    # NOTE: use this to define a specific domain; otherwise, it's best to call everything
+    #       the 'universal_FOON' domain:
+    # pddl_file.write('(define (domain ' + str(os.path.splitext(FOON_subgraph_file)[0]) + ')\n')
+
+    pddl_file.write('(define (domain ' + PDDL_domain_name + ')\n')
+    pddl_file.write('\n')
+    pddl_file.write('(:requirements :adl)\n')
+
+    pddl_file.write('\n')
+
+    pddl_file.write('(:types \n')
+    pddl_file.write('\tobject - object\n')
+    pddl_file.write(')\n')
+
+    pddl_file.write('\n')
+
+    # NOTE: we define all objects as constants for now. Future work should allow object instances.
+    # -- write all possible object types from the subgraph as constants:
+    pddl_file.write('(:constants\n')
+    pddl_file.write('\t; objects from provided FOON subgraph:\n')
+    for N in object_types:
+        pddl_file.write('\t' + str(_reviseObjectLabels(N)) + ' - object\n')
+
+    # -- objects that were used by Alejandro for describing objects being collision-free:
+    pddl_file.write('\n\t; objects used in Agostini et al. 2021 - https://arxiv.org/abs/2007.08251\n')
+    pddl_file.write('\t' + 'air' + ' - object\n')
+    pddl_file.write('\t' + 'table' + ' - object\n')
+
+    pddl_file.write(')\n')
+
+    pddl_file.write('\n')
+
+    pddl_file.write('(:predicates\n')
+    # -- write predicates section of file (predicates are object-centered predicates):
+    pddl_file.write('\t; object-state predicates (from Agostini et al. 2021 - https://arxiv.org/abs/2007.08251)\n')
+    pddl_file.write('\t(in ?obj_1 - object ?obj_2 - object)\n')
+    pddl_file.write('\t(on ?obj_1 - object ?obj_2 - object)\n')
+    pddl_file.write('\t(under ?obj_1 - object ?obj_2 - object)\n')
+    pddl_file.write('\n')
+
+    # -- some predicates are also state-based (driven by perception):
+    pddl_file.write('\t; physical state predicates (from FOON)\n')
+    for S in state_types:
+        pddl_file.write('\t(is-' + S + ' ?obj_1 - object)\n')
+
+    pddl_file.write(')\n')
+
+    pddl_file.write('\n')
+#enddef
+
+
+def _set_PDDL_file_names():
+    global FOON_domain_file, FOON_problem_file
+
+    FOON_domain_file = os.path.splitext(FOON_subgraph_file)[0] + '_domain.pddl'
+    FOON_problem_file = os.path.splitext(FOON_subgraph_file)[0].replace('_domain', '') + '_problem.pddl'
+
+    if output_target == 'gzip':
+        FOON_domain_file, FOON_problem_file = FOON_domain_file + '.gz', FOON_problem_file + '.gz'
+#enddef
+
+
 def _create_PDDL_OCP(file_type=None, ingredient_dropout=0):
     # NOTE: these functions are to convert the given subgraph to the object-centered predicate format
     #	as used in Agostini et al, 2021 - https://arxiv.org/abs/2007.08251
 
     global FOON_subgraph_file, FOON_inputs_file, FOON_domain_file, FOON_problem_file, ingredients_to_ignore
 
-    # -- these are the physical state of matter that we will care about when parsing FOON graphs:
-    state_types = ['whole', 'diced', 'chopped', 'sliced', 'mixed', 'ground', 'juiced', 'spread']
-
-    # -- objects where they "contain" items on top of them rather than inside (i.e., they will have "air" on top):
-    air_on_objects = ['plate', 'pizza pan', 'cutting board']
-
-    # -- these are objects that will be treated as containers:
-    ingr_in_objects = []
-
     if not FOON_subgraph_file:
         FOON_subgraph_file = input('-- Enter file name and path to the FOON graph to be converted: > ')
 
@@ -321,376 +1291,46 @@ def _create_PDDL_OCP(file_type=None, ingredient_dropout=0):
         object_types = sorted(list(object_types))
 
         if ingredient_dropout != 0:
-            # NOTE: the intuition here is to randomly drop a certain number of ingredients from
-            #   preconditions of generated planning operators!
-
-            # -- we will randomly decide on the number of ingredients to drop out, which could be either:
-            if ingredient_dropout == 1:
-                #  1) no more than half of the required ingredients.
-                num_dropout = random.randint(1, round(len(ingredients_to_ignore) / 2.0))
-            else:
-                #  2 no more than all but one ingredient left:
-                num_dropout = random.randint(1, int(len(ingredients_to_ignore) - 1))
-            #endif
-
-            # -- now we create our ingredient "black list" by randomly popping ingredients
-            #       until we are left with the number of ingredients we wish to drop:
-            while len(ingredients_to_ignore) > num_dropout:
-                ingredients_to_ignore.pop( random.randint(0, len(ingredients_to_ignore) - 1) )
-            #endfor
-
-        #endif
+            _select_dropout_ingredients(ingredient_dropout)
 
         # -- now that we have all functional units read, we can proceed to the annotation phase:
 
         # -- create the file we are going to write to:
-        pddl_file = open(FOON_domain_file, 'w')
-
-        if ingredients_to_ignore:
-            for X in range(len(ingredients_to_ignore)):
-                ingredients_to_ignore[X] = _reviseObjectLabels(ingredients_to_ignore[X])
+        with fos._open_sink(FOON_domain_file, output_target) as pddl_file:
 
-            # -- print the list of ingredients that are removed to the terminal...
-            print('  -- NOTE: The following ingredients will be dropped: ' + str(ingredients_to_ignore))
+            _write_OCP_domain_header(pddl_file, object_types)
 
-            # ... and also write a comment about it in the domain file:
-            pddl_file.write('; NOTE: the following ingredients will be dropped:\n')
-            pddl_file.write(';\t' + str(ingredients_to_ignore) + '\n')
+            # -- if requested, compile forced linear chains of functional units into macro-operators (except in watch mode):
+            macro_chains = _find_macro_chains() if use_macros and watch_state is None else []
+            macro_starts = {chain[0][0] : chain for chain in macro_chains}
 
-        # NOTE: use this to define a specific domain; otherwise, it's best to call everything
-        #       the 'universal_FOON' domain:
-        # pddl_file.write('(define (domain ' + str(os.path.splitext(FOON_subgraph_file)[0]) + ')\n')
+            # -- writing actions section of file:
+            for index, FU in enumerate(fga.FOON_lvl3):
+                # -- old way: naming planning operators as "functional_unit_XXXX":
+                # pddl_file.write('(:action functional_unit_' + str(fga.FOON_lvl3.index(FU)) + '\n')
 
-        pddl_file.write('(define (domain universal_FOON)\n')
-        pddl_file.write('\n')
-        pddl_file.write('(:requirements :adl)\n')
+                if index in macro_starts:
+                    # NOTE: a macro-operator is written before the first functional unit in its chain, but the units themselves are kept:
+                    #	a problem may start partway through a chain (e.g., a kitchen file, a state after part of a plan was executed,
+                    #	or a landmark stage), in which case the macro cannot be used and only the remaining units can reach the goal.
+                    _write_OCP_macro_action(pddl_file, macro_starts[index])
 
-        pddl_file.write('\n')
+                if watch_state is not None:
+                    # -- in watch mode, actions were already translated (if needed) by _update_watch_state():
+                    pddl_file.write(watch_state['actions'][watch_state['order'][index]][1])
+                    continue
 
-        pddl_file.write('(:types \n')
-        pddl_file.write('\tobject - object\n')
-        pddl_file.write(')\n')
+                PO_name, preconditions, parsed_effects, unchanged_preconditions, negated_preconditions = _translate_functional_unit_OCP(FU)
 
-        pddl_file.write('\n')
+                _write_OCP_action(pddl_file, PO_name + '_' + str(index), FU.getWord2VecSentence(), preconditions, parsed_effects, unchanged_preconditions, negated_preconditions)
 
-        # NOTE: we define all objects as constants for now. Future work should allow object instances.
-        # -- write all possible object types from the subgraph as constants:
-        pddl_file.write('(:constants\n')
-        pddl_file.write('\t; objects from provided FOON subgraph:\n')
-        for N in object_types:
-            pddl_file.write('\t' + str(_reviseObjectLabels(N)) + ' - object\n')
-
-        # -- objects that were used by Alejandro for describing objects being collision-free:
-        pddl_file.write('\n\t; objects used in Agostini et al. 2021 - https://arxiv.org/abs/2007.08251\n')
-        pddl_file.write('\t' + 'air' + ' - object\n')
-        pddl_file.write('\t' + 'table' + ' - object\n')
-
-        pddl_file.write(')\n')
-
-        pddl_file.write('\n')
-
-        pddl_file.write('(:predicates\n')
-        # -- write predicates section of file (predicates are object-centered predicates):
-        pddl_file.write('\t; object-state predicates (from Agostini et al. 2021 - https://arxiv.org/abs/2007.08251)\n')
-        pddl_file.write('\t(in ?obj_1 - object ?obj_2 - object)\n')
-        pddl_file.write('\t(on ?obj_1 - object ?obj_2 - object)\n')
-        pddl_file.write('\t(under ?obj_1 - object ?obj_2 - object)\n')
-        pddl_file.write('\n')
-
-        # -- some predicates are also state-based (driven by perception):
-        pddl_file.write('\t; physical state predicates (from FOON)\n')
-        for S in state_types:
-            pddl_file.write('\t(is-' + S + ' ?obj_1 - object)\n')
-
-        pddl_file.write(')\n')
-
-        pddl_file.write('\n')
-
-        # -- writing actions section of file:
-        for FU in fga.FOON_lvl3:
-            # -- old way: naming planning operators as "functional_unit_XXXX":
-            # pddl_file.write('(:action functional_unit_' + str(fga.FOON_lvl3.index(FU)) + '\n')
-
-            # -- list of objects that should be ignored when repeating predicates from preconditions:
-            objects_to_ignore = []
-
-            # -- creating name for planning operators (PO) based on FOON action label and objects:
-            PO_name = str(FU.getMotion().getMotionLabel())
-            for N in range(FU.getNumberOfInputs()):
-                # -- finding the active or focal object based on the action label:
-                focal_object = ''
-                if not FU.getInputNodes()[N].hasIngredients():
-                    if PO_name in ['pick-and-place', 'pour', 'sprinkle', 'insert'] and FU.getInputDescriptor(N) == 1:
-                        # -- 'pick-and-place' and 'pour' are done on an object with motion descriptor 1:
-                        focal_object = FU.getInputNodes()[N].getObjectLabel()
-                    elif PO_name in ['slice', 'dice', 'chop', 'cut', 'scoop', 'scoop and pour'] and FU.getInputDescriptor(N) == 0:
-                        # -- object being acted upon with the above labels will have a motion descriptor 0:
-                        focal_object = FU.getInputNodes()[N].getObjectLabel()
-
-                elif PO_name == 'mix' or PO_name == 'stir':
-                    focal_object = 'ingredients'
-
-                if focal_object:
-                    PO_name += '_' + focal_object
-                    break
-
-            pddl_file.write('(:action ' + _reviseObjectLabels(PO_name) + '_' + str(fga.FOON_lvl3.index(FU)) + '\n')
-
-            pddl_file.write('\t; description: <' + FU.getWord2VecSentence() + '>\n')
-
-            pddl_file.write('\t:parameters ( )\n')
-
-            # -- preconditions: all input nodes and their initial states before an action is executed
-            pddl_file.write('\t:precondition (and\n')
-
-            preconditions = []
-            for N in FU.getInputList():
-                # -- position_specified: flag to check if there were any object-centered information assigned to object node:
-                position_specified = False
-
-                # -- review all states in an object node:
-                for S in N.getStatesList():
-                    if S[1] in ['in', 'on', 'under'] and bool(S[2]):
-                        # -- get the corresponding labels:
-                        oc_relation, this_obj, relative_obj = str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), str(_reviseObjectLabels(S[2]))
-                        position_specified = True
-
-                        if S[2] == 'nothing': relative_obj = 'air'
-
-                        if relative_obj == 'air':
-                            if oc_relation in ['under']:
-                                oc_relation = 'on'
-                                this_obj, relative_obj = relative_obj, this_obj
-                            else:
-                                continue
-
-                        statement = [oc_relation, relative_obj, this_obj]
-
-                        # -- handling containers which "hold" things on top of it (viz. cutting board):
-                        if S[2] in ingr_in_objects:
-                            statement[0] = 'in'
-
-                        # -- append predicate to the list of precondition predicates for this planning operator:
-                        preconditions.append(statement)
-                        if S[1] == 'on' and relative_obj != 'air': # if S[1] in ['in', 'on']:
-                            preconditions.append( ['under', this_obj, relative_obj] )
-
-                        # -- check if there are any other states existing that required the relative object's name:
-                        for pred in preconditions:
-                            if 'LOC' in pred:
-                                pred[pred.index('LOC')] = relative_obj
-
-                    # if S[1] in ['empty']:
-                    #     # -- emptiness is described by the object concept "air":
-                    #     preconditions.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), 'air'] )
-
-                    # if 'contains' in S[1]:
-                    #     for I in N.getIngredients():
-                    #         preconditions.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), _reviseObjectLabels(I)] )
-
-                    if S[1] in state_types:
-                        if S[1] == 'mixed':
-                            # -- assumption: if something is mixed, then on the *lower* level, the container can be seen as a target for stirring to occur.
-                            #		therefore, we got to find out where the object is located to then make changes to it later.
-                            preconditions.append(['is-mixed', 'LOC', None])
-                            #effects.append(['is-mixed', str(_reviseObjectLabels(N.getObjectLabel())), None])
-                        else:
-                            # -- else, just treat other types of structural states differently:
-                            preconditions.append( ['is-'+ str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), None] )
-
-                # -- if no position is specified explicitly, then we can assume that the objects are on the work surface:
-                if not position_specified:
-                    # -- for now, let's randomly assign certain objects to different parts of the table (i.e., table_m, table_l, or table_r):
-                    table_part = table_positions[int(random.random() * len(table_positions))]
-
-                    preconditions.append( ['under', str(_reviseObjectLabels(N.getObjectLabel())), table_part] )
-                    preconditions.append( ['on', table_part, str(_reviseObjectLabels(N.getObjectLabel()))] )
-
-            # -- remove any duplicate preconditions (turn lists to tuples then back again):
-            preconditions = [list(y) for y in set([tuple(x) for x in preconditions])]
-
-            # NOTE: dropped predicates are those containing references to objects we want removed from the recipe:
-            dropped_predicates = []
-            for predicate in preconditions:
-                # -- if a predicate contains an ingredient that needs to be ignored, then we comment it out:
-                if bool(set(predicate) & set(ingredients_to_ignore)):
-                    dropped_predicates.append(predicate)
-                else:
-                    pddl_file.write('\t\t(' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ')\n')
-
-            # -- some objects can be dropped (i.e., simply commented out) from the PDDL file:
-            if dropped_predicates:
-                pddl_file.write('\n\t\t; NOTE: the following predicates were removed due to ingredient dropout:\n')
-                for predicate in dropped_predicates:
-                    pddl_file.write('\t\t; (' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ')\n')
-
-            pddl_file.write('\t)\n')
-
-            # -- preconditions: all output nodes and their initial states after an action is executed
-            pddl_file.write('\t:effect (and\n')
-
-            effects = []
-            for N in FU.getOutputList():
-                # -- position_specified: flag to check if there were any object-centered information assigned to object node:
-                position_specified = False
-
-                # -- review all states in an object node:
-                for S in N.getStatesList():
-                    if S[1] in ['in', 'on', 'under'] and bool(S[2]):
-                        # -- get the corresponding labels:
-                        oc_relation, this_obj, relative_obj = str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), str(_reviseObjectLabels(S[2]))
-                        position_specified = True
-
-                        if S[2] == 'nothing': relative_obj = 'air'
-
-                        if relative_obj == 'air':
-                            if oc_relation in ['under']:
-                                oc_relation = 'on'
-                                this_obj, relative_obj = relative_obj, this_obj
-                            else:
-                                continue
-
-                        statement = [oc_relation, relative_obj, this_obj]
-
-                        # -- handling containers which "hold" things on top of it (viz. cutting board):
-                        if S[2] in ingr_in_objects:
-                            statement[0] = 'in'
-
-                        # -- append predicate to the list of effect predicates for this planning operator:
-                        effects.append(statement)
-                        if S[1] == 'on': # if S[1] in ['in', 'on']:
-                            effects.append( ['under', this_obj, relative_obj] )
-
-                        # -- check if there are any other states existing that required the relative object's name:
-                        for pred in effects:
-                            if 'LOC' in pred:
-                                pred[pred.index('LOC')] = relative_obj
-
-                    # if S[1] in ['empty']:
-                    #     # -- emptiness is described by the object concept "air":
-                    #     effects.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), 'air'] )
-
-                    # if 'contains' in S[1]:
-                    #     for I in N.getIngredients():
-                    #         effects.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), _reviseObjectLabels(I)] )
-
-                    if S[1] in state_types:
-                        if S[1] == 'mixed':
-                            # -- assumption: if something is mixed, then on the *lower* level, the container can be seen as a target for stirring to occur.
-                            #		therefore, we got to find out where the object is located to then make changes to it later.
-                            effects.append(['is-mixed', 'LOC', None])
-                            #effects.append(['is-mixed', str(_reviseObjectLabels(N.getObjectLabel())), None])
-                        else:
-                            # -- else, just treat other types of structural states differently:
-                            effects.append( ['is-'+ str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), None] )
-
-                # -- if no position is specified explicitly, then we can assume that the objects are on the work surface:
-                if not position_specified:
-                    if FU.getMotion().getMotionLabel() == 'scoop':
-                        if FU.getMotionDescriptor(FU.getOutputNodes().index(N), is_input=False) == 1 and N.hasIngredients():
-                            # -- if we are scooping, then the object would actually be in the hand and not the table:
-                            objects_to_ignore.append(N.getObjectLabel())
-                    else:
-                        table_part = table_positions[int(random.random() * len(table_positions))]
-
-                        effects.append( ['under', str(_reviseObjectLabels(N.getObjectLabel())), table_part] )
-                        effects.append( ['on', table_part, str(_reviseObjectLabels(N.getObjectLabel()))] )
-
-            # -- remove any duplicate effects (turn lists to tuples then back again):
-            preconditions = [list(y) for y in set([tuple(x) for x in preconditions])]
-
-            parsed_effects = []
-            for predicate in effects:
-                # -- checking for any effects that are not in preconditions (new effects) as well as removing duplicates:
-                if predicate not in preconditions and predicate not in parsed_effects:
-                    parsed_effects.append(predicate)
-
-            pddl_file.write('\t\t; new effects of executing this functional unit:\n')
-            for predicate in parsed_effects:
-                pddl_file.write('\t\t(' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ')\n')
-
-            # NOTE: we are searching for any predicates that may exist in both preconditions and effects:
-            unchanged_preconditions = []
-            for predicate in preconditions:
-                if predicate in effects:
-                    unchanged_preconditions.append(predicate)
-
-            # negated_preconditions = []
-            # for predicate_1 in parsed_effects:
-            #     for predicate_2 in unchanged_preconditions:
-            #         # -- checking for partial overlap for negation of states:
-            #         if predicate_1[0] == predicate_2[0] and predicate_1[1] == predicate_2[1] and predicate_1[2] != predicate_2[2]:
-            #             # -- looking for any evidence of changes:
-            #             add_to_negation = False
-
-            #             if predicate_2[0] == 'under' and predicate_2[2] == 'table':
-            #                 # -- in the case of an object that used to be on the table,
-            #                 #       we need to negate that predicate:
-            #                 add_to_negation = True
-
-            #             # NOTE: checking if ingredients have been transferred in some way:
-            #             if not add_to_negation:
-
-            #                 for N in FU.getOutputList():
-            #                     if 'air' in predicate_2:
-            #                         if N.getObjectLabel() == predicate_2[1].replace('_', ' ') and len(N.getIngredients()) > 0:
-            #                             # -- intuition :- if an object was seen as empty (i.e., has "air") but now it has ingredients,
-            #                             #       then we need to check if that object now contains at least ingredient:
-            #                             add_to_negation = True
-
-            #                     elif N.getObjectLabel() == predicate_2[2].replace('_', ' ') and predicate_2[1].replace('_', ' ') not in N.getIngredients():
-            #                         # -- intuition :- if an object was under something before,
-            #                         #       we check if there is evidence that the object is no longer under that object
-            #                         #           (e.g., the container is empty or no longer contains that object)
-            #                         add_to_negation = True
-
-            #                     if add_to_negation:
-            #                         break
-
-            #             if add_to_negation:
-            #                 negated_preconditions.append(predicate_2)
-            #                 unchanged_preconditions.remove(predicate_2)
-
-            #         elif predicate_1[0] != predicate_2[0] and predicate_1[0] in ['on', 'under'] and predicate_2[0] in ['on', 'under']:
-            #             # -- maybe there is a predicate that indicates some other state change for something else:
-            #             if predicate_1[1] == predicate_2[2] and predicate_1[2] == predicate_2[1]:
-            #                 # -- state-wise negation:
-            #                 negated_preconditions.append(predicate_2)
-            #                 unchanged_preconditions.remove(predicate_2)
-
-            #         elif predicate_1[0] != predicate_2[0] and predicate_1[1] == predicate_2[1] and predicate_1[2] == predicate_2[2]:
-            #             # -- state-wise negation:
-            #             negated_preconditions.append(predicate_2)
-            #             unchanged_preconditions.remove(predicate_2)
-
-            negated_preconditions = []
-            for predicate in preconditions:
-                if predicate not in parsed_effects and predicate not in unchanged_preconditions:
-                    negated_preconditions.append(predicate)
-
-            if unchanged_preconditions:
-                pddl_file.write('\n\t\t; preconditions that did not get changed in some way:\n')
-                for predicate in unchanged_preconditions:
-                    #if len(set(objects_to_ignore) & set(predicate)) == 0: # -- uncomment this to ignore return to table for some objects
-                    pddl_file.write('\t\t(' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ')\n')
-
-            if negated_preconditions:
-                pddl_file.write('\n\t\t; negated preconditions:\n')
-                for predicate in negated_preconditions:
-                    pddl_file.write('\t\t(not (' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ') )\n')
-
-            pddl_file.write('\t)\n')
-
-            pddl_file.write(')\n')
-
-            pddl_file.write('\n')
-
-        #endfor
+            #endfor
 
-        pddl_file.write(')')
+            if macro_chains:
+                # -- write the macro-to-unit expansion table so that plans can be expanded to functional units for execution:
+                _write_macro_table(os.path.splitext(FOON_subgraph_file)[0] + '_macros.txt', macro_chains)
 
-        # -- make sure to close the file after writing to it:
-        pddl_file.close()
+            pddl_file.write(')')
     #enddef
 
     def _create_problem_file():
@@ -702,215 +1342,624 @@ def _create_PDDL_OCP(file_type=None, ingredient_dropout=0):
         #	2. Read an existing domain file to get all of the possible objects that could exist.
         #	3. Write the kitchen items (as their respective object key) as objects that can possibly exist
 
-        # -- read the objects available to us (i.e. the kitchen) using FGA's _identifyKitchenItems function:
         if FOON_inputs_file:
-            # -- use an existing list with the following:
+            # -- read the objects available to us (i.e. the kitchen) using FGA's _identifyKitchenItems function:
             kitchen_items = fga._identifyKitchenItems(FOON_inputs_file)
         else:
-            # -- just in case, delete the current inputs-only node list and generate a new one:
-            try:
-                os.remove('FOON-input_only_nodes.txt')
-            except FileNotFoundError:
-                pass
-            kitchen_items = fga._identifyKitchenItems()
+            # -- use the starting nodes found while indexing the graph (no need to go through a file):
+            kitchen_items = starting_nodes
+
+            if export_input_nodes:
+                # -- just in case, delete the current inputs-only node list and have FGA generate a new one:
+                try:
+                    os.remove('FOON-input_only_nodes.txt')
+                except FileNotFoundError:
+                    pass
+                fga._identifyKitchenItems()
+                print("  -- Starting nodes exported to 'FOON-input_only_nodes.txt'.")
         #end
 
-        # -- create the file we are going to write to:
-        pddl_file = open(os.path.splitext(FOON_subgraph_file)[0].replace('_domain', '') + '_problem.pddl', 'w')
-        domain_file = open(os.path.splitext(FOON_subgraph_file)[0] + '_domain.pddl', 'r')
-        domain_lines = domain_file.readlines()
-
-        # -- use the domain file's domain name for defining this problem:
-        start = 0
-        while domain_lines[start].startswith(';'):
-            # -- this is done in case we have some comments about dropout:
-            start += 1
-
         if ingredients_to_ignore:
             for X in range(len(ingredients_to_ignore)):
                 ingredients_to_ignore[X] = _reviseObjectLabels(ingredients_to_ignore[X])
 
-            # -- write the list of dropped ingredients to the problem file:
-            pddl_file.write('; NOTE: the following ingredients will be dropped:\n')
-            pddl_file.write(';\t' + str(ingredients_to_ignore) + '\n')
-
-        pddl_file.write(domain_lines[start].replace('domain', 'problem') + '\n')
-        pddl_file.write(domain_lines[start].split('(define ')[1].replace('domain', ':domain') + '\n')
-
-        pddl_file.write('(:init' + '\n')
-
-        initiation_set, already_seen = [], []
-        for N in kitchen_items:
-            # -- position_specified: flag to check if there were any object-centered information assigned to object node:
-            position_specified = False
-
-            # -- review all states in an object node:
-            for S in N.getStatesList():
-                if S[1] in ['in', 'on', 'under'] and bool(S[2]):
-                    # -- get the corresponding labels:
-                    oc_relation, this_obj, relative_obj = str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), str(_reviseObjectLabels(S[2]))
-                    position_specified = True
-
-                    if S[2] == 'nothing': relative_obj = 'air'
-
-                    if relative_obj == 'air':
-                        if oc_relation in ['under']:
-                            oc_relation = 'on'
-                            this_obj, relative_obj = relative_obj, this_obj
-                        else:
-                            continue
-
-                    initiation_set.append( [oc_relation, relative_obj, this_obj] )
-                    if S[1] == 'on' and relative_obj != 'air': # if S[1] in ['in', 'on']:
-                        initiation_set.append( ['under', this_obj, relative_obj] )
-
-                    # -- check if there are any other states existing that required the relative object's name:
-                    for pred in initiation_set:
-                        if 'LOC' in pred:
-                            pred[pred.index('LOC')] = relative_obj
-
-                # if S[1] in ['empty']:
-                #     # -- emptiness is described by the object concept "air":
-                #     initiation_set.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), 'air'] )
-
-                # if S[1] == 'contains':
-                #     for I in N.getIngredients():
-                #         initiation_set.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), _reviseObjectLabels(I)] )
-
-                if S[1] in state_types:
-                    if S[1] == 'mixed':
-                        # -- assumption: if something is mixed, then on the *lower* level, the container can be seen as a target for stirring to occur.
-                        #		therefore, we got to find out where the object is located to then make changes to it later.
-                        initiation_set.append(['is-mixed', 'LOC', None])
-                    else:
-                        # -- else, just treat other types of structural states differently:
-                        initiation_set.append( ['is-'+ str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), None] )
+        # -- translate the kitchen items and goal nodes into an indexed set of facts, which is then written to the file:
+        problem_state = _build_problem_state(kitchen_items)
 
-            # -- if no position is specified explicitly, then we can assume that the objects are on the work surface:
-            if not position_specified:
-                # -- for now, let's randomly assign certain objects to different parts of the table (i.e., table_m, table_l, or table_r):
-                table_part = table_positions[int(random.random() * len(table_positions))]
+        if watch_state is not None:
+            # -- in watch mode, only rewrite the problem file if its initial state or goals have changed:
+            problem_facts = (list(problem_state.facts), list(problem_state.goals))
+            if problem_facts == watch_state['problem']:
+                print('  -- Problem file is unchanged.')
+                return
+            watch_state['problem'] = problem_facts
+
+        problem_state.writeProblem(FOON_problem_file, output_target)
+    #enddef
+
+    _set_PDDL_file_names()
 
-                initiation_set.append( ['under', str(_reviseObjectLabels(N.getObjectLabel())), table_part] )
-                initiation_set.append( ['on', table_part, str(_reviseObjectLabels(N.getObjectLabel()))] )
-            #endif
-        #endfor
+    # -- create a FOON using the FGA code's _constructFOON() method
+    fga._constructFOON(FOON_subgraph_file)
 
-        for predicate in initiation_set:
-            if predicate not in already_seen:
-                already_seen.append(predicate)
-                pddl_file.write('\t(' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ')\n')
+    fga.flag_buildObjectToUnitMap = True
+
+    fga._buildInternalMaps()
 
-        pddl_file.write(')\n')
-        pddl_file.write('\n')
+    # -- index the graph's object nodes to find its starting nodes (used for the problem file's initial state):
+    starting_nodes = _build_node_index()
+
+    if watch_state is not None:
+        _update_watch_state()
+
+    if file_type == 1:
+        _create_domain_file()
+    elif file_type == 2:
+        _create_problem_file()
+    else:
+        _create_domain_file()
+        print()
+        _create_problem_file()
+        print()
+    #endif
+#enddef
 
-        pddl_file.write('(:goal (and\n')
 
-        # -- now we need to define the goal for this subgraph by using the goal markers found in subgraphs:
-        goal_set, already_seen = [], []
-        for N in fga.FOON_nodes[2]:
-            # -- make sure we look only at object nodes (as motion nodes are also in this list) and the object node must be a goal:
-            if not isinstance(N, fga.FOON.Object) or not N.isGoal:
+def _create_PDDL_OCP_from_database(file_type=None, ingredient_dropout=0):
+    # NOTE: this function creates the same OCP files as _create_PDDL_OCP(), but the subgraph is read from an SQLite database
+    #	(see FOON_database.py) rather than kept in FGA's lists: functional units are streamed from the database one at a time,
+    #	and their actions are written as soon as they are translated. If the subgraph was never imported (or the file has changed since
+    #	it was imported), it is imported first.
+    # NOTE: if goal_pruning is True, only units that (directly or indirectly) produce a goal node are written.
+    import FOON_database as fdb
+
+    global FOON_subgraph_file
+
+    if not FOON_subgraph_file:
+        FOON_subgraph_file = input('-- Enter file name and path to the FOON graph to be converted: > ')
+
+    _set_PDDL_file_names()
+
+    connection = fdb._connect(database_file)
+
+    subgraph_id = fdb._get_subgraph_id(connection, FOON_subgraph_file)
+    if subgraph_id is None or not fdb._is_subgraph_current(connection, FOON_subgraph_file):
+        print(" -- [FOON_to_PDDL] : Importing file '" + FOON_subgraph_file + "' into database '" + database_file + "'...")
+        subgraph_id = fdb._import_subgraph(connection, FOON_subgraph_file)
+
+    if goal_pruning:
+        fdb._select_relevant_units(connection, subgraph_id)
+
+    if file_type != 2:
+        print(" -- [FOON_to_PDDL] : Creating domain file named '" + FOON_domain_file + "'...")
+
+        if ingredient_dropout != 0:
+            _select_dropout_ingredients(ingredient_dropout)
+
+        with fos._open_sink(FOON_domain_file, output_target) as pddl_file:
+
+            _write_OCP_domain_header(pddl_file, fdb._get_object_labels(connection, subgraph_id, goal_pruning))
+
+            for index, FU in fdb._stream_units(connection, subgraph_id, goal_pruning):
+                PO_name, preconditions, parsed_effects, unchanged_preconditions, negated_preconditions = _translate_functional_unit_OCP(FU)
+
+                _write_OCP_action(pddl_file, PO_name + '_' + str(index), FU.getWord2VecSentence(), preconditions, parsed_effects, unchanged_preconditions, negated_preconditions)
+            #endfor
+
+            pddl_file.write(')')
+        print()
+
+    if file_type != 1:
+        print(" -- [FOON_to_PDDL] : Creating problem file named '" + FOON_problem_file + "'...")
+
+        for X in range(len(ingredients_to_ignore)):
+            ingredients_to_ignore[X] = _reviseObjectLabels(ingredients_to_ignore[X])
+
+        problem_state = _build_problem_state(fdb._get_starting_nodes(connection, subgraph_id, goal_pruning), goal_nodes=fdb._get_goal_nodes(connection, subgraph_id))
+        problem_state.writeProblem(FOON_problem_file, output_target)
+        print()
+
+    connection.close()
+#enddef
+
+
+def _fingerprint_functional_unit(FU):
+    # NOTE: a functional unit's fingerprint only depends on its contents (i.e., its motion and its input and output nodes),
+    #	so a unit keeps the same fingerprint no matter where it appears in the subgraph file.
+    import hashlib
+
+    contents = [str(FU.getMotion().getMotionLabel())]
+    for is_input, nodes in [(True, FU.getInputList()), (False, FU.getOutputList())]:
+        for X, N in enumerate(nodes):
+            contents.append(('I' if is_input else 'O') + str(FU.getMotionDescriptor(X, is_input=is_input)))
+            contents.append(str(N.getObjectKey()) + str(N.getObjectLabel()) + str(N.getStatesList()) + str(N.getIngredients()))
+
+    return hashlib.sha1('\t'.join(contents).encode('utf-8')).hexdigest()
+#enddef
+
+
+def _get_unit_signature(FU):
+    # -- a signature is a tuple of a unit's motion and the keys of its input and output nodes:
+    return (FU.getMotion().getMotionLabel(), set(N.getObjectKey() for N in FU.getInputList()), set(N.getObjectKey() for N in FU.getOutputList()))
+#enddef
+
+
+def _get_unit_similarity(signature, other_signature):
+    # -- units are more alike if they have the same motion and more input and output nodes in common:
+    return (1 if signature[0] == other_signature[0] else 0) + len(signature[1] & other_signature[1]) + len(signature[2] & other_signature[2])
+#enddef
+
+
+def _update_watch_state():
+    # NOTE: this function compares the functional units of the loaded FOON to those from the last conversion in watch mode,
+    #	and only the units that were added or modified are translated again. Each unit keeps the index in its action name
+    #	from when it was first seen, so that unrelated edits do not rename actions (which would invalidate diffs and plan caches).
+    #	A modified unit takes the index of the unit that it replaces (found by aligning the units before and after the edit,
+    #	and then pairing the units that were replaced with the new units that are most alike).
+    import difflib
+
+    fingerprints = [_fingerprint_functional_unit(FU) for FU in fga.FOON_lvl3]
+
+    if not watch_state['order']:
+        # -- on the first conversion, action names are the same as the ones made outside of watch mode:
+        indices = list(range(len(fingerprints)))
+        watch_state['next_index'] = len(fingerprints)
+    else:
+        current, previous = set(fingerprints), set(watch_state['order'])
+
+        # -- units that are still in the file keep their names (even if they were moved):
+        indices = [(watch_state['actions'][F][0] if F in previous else None) for F in fingerprints]
+
+        # -- align the units before and after the edit, so that a modified unit takes the place of the unit it replaces:
+        num_modified = 0
+        matcher = difflib.SequenceMatcher(None, watch_state['order'], fingerprints, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != 'replace':
                 continue
 
-            # -- position_specified: flag to check if there were any object-centered information assigned to object node:
-            position_specified = False
-
-            for S in N.getStatesList():
-                if S[1] in ['in', 'on', 'under'] and bool(S[2]):
-                    # -- get the corresponding labels:
-                    oc_relation, this_obj, relative_obj = str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), str(_reviseObjectLabels(S[2]))
-                    position_specified = True
-
-                    if S[2] == 'nothing': relative_obj = 'air'
-
-                    if relative_obj == 'air':
-                        if oc_relation in ['under']:
-                            oc_relation = 'on'
-                            this_obj, relative_obj = relative_obj, this_obj
-                        else:
-                            continue
-
-                    goal_set.append( [oc_relation, relative_obj, this_obj] )
-                    if S[1] == 'on' and relative_obj != 'air':
-                        goal_set.append( ['under', this_obj, relative_obj] )
-
-                    # -- check if there are any other states existing that required the relative object's name:
-                    for pred in goal_set:
-                        if 'LOC' in pred:
-                            pred[pred.index('LOC')] = relative_obj
-
-                # if S[1] in ['empty']:
-                #     # -- emptiness is described by the object concept "air":
-                #     goal_set.append( [('on' if N.getObjectLabel() == 'cutting board' else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), 'air'] )
-
-                # if S[1] == 'contains':
-                #     for I in N.getIngredients():
-                #         initiation_set.append( [('on' if N.getObjectLabel() in air_on_objects else 'in'), str(_reviseObjectLabels(N.getObjectLabel())), _reviseObjectLabels(I)] )
-
-                if S[1] in state_types:
-                    if S[1] == 'mixed':
-                        # -- assumption: if something is mixed, then on the *lower* level, the container can be seen as a target for stirring to occur.
-                        #		therefore, we got to find out where the object is located to then make changes to it later.
-                        goal_set.append(['is-mixed', 'LOC', None])
-                    else:
-                        # -- else, just treat other types of structural states differently:
-                        goal_set.append( ['is-'+ str(S[1]), str(_reviseObjectLabels(N.getObjectLabel())), None] )
+            # -- pair each new unit with the replaced unit that is most alike (i.e., the same motion and the most input and output nodes in common),
+            #	rather than by position, so that a unit inserted next to a modified unit does not take the modified unit's name:
+            replaced = [F for F in watch_state['order'][i1:i2] if F not in current]
+            pairs = []
+            for F in replaced:
+                for X in range(j1, j2):
+                    if indices[X] is None:
+                        similarity = _get_unit_similarity(watch_state['actions'][F][2], _get_unit_signature(fga.FOON_lvl3[X]))
+                        if similarity > 0:
+                            pairs.append((-similarity, abs((X - j1) - (watch_state['order'].index(F) - i1)), F, X))
+
+            for _, _, F, X in sorted(pairs):
+                if F in replaced and indices[X] is None:
+                    indices[X] = watch_state['actions'][F][0]
+                    replaced.remove(F)
+                    num_modified += 1
+
+        # -- any other new units are given the next unused index:
+        num_added = 0
+        for X in range(len(indices)):
+            if indices[X] is None:
+                indices[X] = watch_state['next_index']
+                watch_state['next_index'] += 1
+                num_added += 1
+
+        num_removed = len(previous - current) - num_modified
+
+        print('  -- Changes found: ' + str(num_added) + ' unit(s) added, ' + str(num_removed) + ' unit(s) removed, ' + str(num_modified) + ' unit(s) modified.')
+
+    actions = {}
+    for X, F in enumerate(fingerprints):
+        if F in watch_state['actions'] and watch_state['actions'][F][0] == indices[X]:
+            # -- reuse the action from the last conversion:
+            actions[F] = watch_state['actions'][F]
+            continue
+
+        PO_name, preconditions, parsed_effects, unchanged_preconditions, negated_preconditions = _translate_functional_unit_OCP(fga.FOON_lvl3[X])
+
+        action_text = fos.MemorySink(None)
+        _write_OCP_action(action_text, PO_name + '_' + str(indices[X]), fga.FOON_lvl3[X].getWord2VecSentence(), preconditions, parsed_effects, unchanged_preconditions, negated_preconditions)
+        actions[F] = (indices[X], action_text.getvalue(), _get_unit_signature(fga.FOON_lvl3[X]))
+
+    watch_state['actions'], watch_state['order'] = actions, fingerprints
+#enddef
+
+
+def _watch_FOON(file_type=None, poll_interval=1.0):
+    # NOTE: in watch mode, the subgraph file is converted every time it is saved; only the functional units that were added,
+    #	removed or modified since the last conversion are translated again, and the problem file is only rewritten if it changed.
+    global watch_state
+
+    if not FOON_subgraph_file:
+        sys.exit(' -- ERROR: A FOON subgraph file must be given to watch for changes!')
+
+    watch_state = {'actions': {}, 'order': [], 'next_index': 0, 'problem': None}
+
+    print(" -- [FOON_to_PDDL] : Watching file '" + FOON_subgraph_file + "' for changes (press Ctrl+C to stop)...\n")
+
+    last_modified = None
+    try:
+        while True:
+            try:
+                modified = os.path.getmtime(FOON_subgraph_file)
+            except OSError:
+                # -- some editors briefly remove a file while saving it:
+                modified = None
+
+            if modified is not None and modified != last_modified:
+                last_modified = modified
+
+                # -- make sure that functional units from the last conversion are removed before loading the file again:
+                if hasattr(fga, '_resetFOON'):
+                    fga._resetFOON()
+
+                try:
+                    _create_PDDL_OCP(file_type)
+                    if check_files and file_type is None:
+                        _check_PDDL_files()
+                except Exception as e:
+                    # -- a file that is only partially edited may not be readable yet, so we wait for the next save:
+                    print(' -- WARNING: Could not convert file: ' + str(e))
+
+            time.sleep(poll_interval)
+
+    except KeyboardInterrupt:
+        print('\n -- [FOON_to_PDDL] : Stopped watching file.')
+#enddef
+
+
+def _find_batch_files(pattern):
+    # -- a directory stands for all of the subgraph files in it, leaving out any text files written by this script (e.g., macro tables):
+    import glob
+    file_names = glob.glob(os.path.join(pattern, '*.txt') if os.path.isdir(pattern) else pattern)
+    return sorted(F for F in file_names if not any(F.endswith(suffix) for suffix in generated_file_suffixes))
+#enddef
+
+
+def _init_batch_worker(settings):
+    # NOTE: settings are passed to each worker explicitly, since workers do not always inherit the globals set by _check_args():
+    globals().update(settings)
+
+    # -- messages from workers would only be mixed together, so only the summary for each file is printed (see _convert_batch()):
+    sys.stdout = open(os.devnull, 'w')
+#enddef
+
+
+def _convert_batch_file(file_name):
+    global FOON_subgraph_file
+
+    # -- make sure that functional units from the last file converted by this worker are removed:
+    if hasattr(fga, '_resetFOON'):
+        fga._resetFOON()
+
+    error, num_problems = None, None
+    try:
+        FOON_subgraph_file = file_name
+        _create_PDDL_OCP(file_type)
+
+        if check_files and file_type is None:
+            results = _check_PDDL_files()
+            num_problems = sum(len(results[K]) for K in results)
+    except Exception as e:
+        error = str(e)
+
+    return file_name, error, num_problems
+#enddef
+
+
+def _convert_batch(file_names, num_workers=None):
+    # NOTE: this function converts many subgraph files (in the 'OCP' format) using a pool of worker processes,
+    #	where each worker converts one file at a time with the same settings as this process (see batch_settings).
+    #	If check_files is True, each file is also checked by its worker, and the number of problems found is printed with each file.
+    # NOTE: workers do not share translations of labels or functional units: translating a unit takes less time than looking it up
+    #	in a cache shared between processes (or even than computing a key for it), so such a cache only made batches slower.
+    import multiprocessing
+
+    print(' -- [FOON_to_PDDL] : Converting ' + str(len(file_names)) + ' file(s) with ' + str(num_workers if num_workers else os.cpu_count()) + ' worker(s)...')
+
+    num_errors, num_checked, files_with_problems = 0, 0, 0
+    pool = multiprocessing.Pool(num_workers, initializer=_init_batch_worker, initargs=(dict((S, globals()[S]) for S in batch_settings),))
+    try:
+        for file_name, error, num_problems in pool.imap_unordered(_convert_batch_file, file_names):
+            if error:
+                num_errors += 1
+                print("  -- ERROR: Could not convert file '" + file_name + "': " + error)
+            elif num_problems is not None:
+                num_checked += 1
+                files_with_problems += 1 if num_problems else 0
+                print("  -- Converted file '" + file_name + "' (" + (str(num_problems) + ' problem(s) found by the checker' if num_problems else 'no problems found') + ').')
+            else:
+                print("  -- Converted file '" + file_name + "'.")
+    finally:
+        pool.close()
+        pool.join()
+
+    print(' -- [FOON_to_PDDL] : Converted ' + str(len(file_names) - num_errors) + ' of ' + str(len(file_names)) + ' file(s).')
+    if num_checked:
+        print(' -- [FOON_PDDL_checker] : ' + str(files_with_problems) + ' of ' + str(num_checked) + ' checked file(s) have problems.')
+#enddef
 
-            # -- if no position is specified explicitly, then we can assume that the objects are on the work surface (i.e., table):
-            if not position_specified:
-                # -- for now, let's randomly assign certain objects to different parts of the table (i.e., table_m, table_l, or table_r):
-                table_part = table_positions[int(random.random() * len(table_positions))]
 
-                goal_set.append( ['under', str(_reviseObjectLabels(N.getObjectLabel())), table_part] )
-                goal_set.append( ['on', table_part, str(_reviseObjectLabels(N.getObjectLabel()))] )
+def _check_PDDL_files():
+    # NOTE: this function checks the domain and problem files that were last generated before they are given to a planner:
+    import FOON_PDDL_checker as fpdc
 
-        for predicate in goal_set:
-            # -- if there were some ingredients we wanted to drop, then we drop them also from the goal:
-            if bool(set(predicate) & set(ingredients_to_ignore)):
+    if output_target == '-':
+        print(' -- [FOON_to_PDDL] : Files streamed to stdout cannot be checked.')
+        return None
+
+    print(" -- [FOON_to_PDDL] : Checking domain and problem files for '" + FOON_subgraph_file + "'...")
+    return fpdc._check_files(fos._read_output(FOON_domain_file), fos._read_output(FOON_problem_file))
+#enddef
+
+
+def _find_plan(planner_command, cache=None):
+    # NOTE: this function solves the domain and problem files that were last generated by _create_PDDL_OCP(),
+    #	looking up the plan cache first so that regenerating the same recipe and kitchen does not run the planner again.
+    if output_target == '-':
+        print(' -- [FOON_to_PDDL] : Files streamed to stdout cannot be solved; please pipe them to a planner instead.')
+        return None, None
+
+    print(" -- [FOON_to_PDDL] : Solving problem file named '" + FOON_problem_file + "'...")
+
+    domain_text, problem_text = fos._read_output(FOON_domain_file), fos._read_output(FOON_problem_file)
+    plan, stats = fpc._solve_PDDL(domain_text, problem_text, planner_command, cache=cache)
+
+    if plan is None:
+        print('  -- No plan was found! Please review the problem file for any predicates that are not being satisfied.')
+        return None, stats
+
+    print('  -- Plan found' + (' (from plan cache)' if stats.get('cached') else '') + ':')
+    for step in plan:
+        print('\t' + step)
+
+    macro_table_file = os.path.splitext(FOON_subgraph_file)[0] + '_macros.txt'
+    if use_macros and os.path.exists(macro_table_file):
+        # -- expand any macro-operators back into the functional units that they were compiled from:
+        plan = _expand_macro_plan(plan, _load_macro_table(macro_table_file))
+        print('  -- Plan expanded to functional units: ' + str(plan))
+
+    return plan, stats
+#enddef
+
+
+def _find_landmarks():
+    # NOTE: a landmark is an object node that every solution must pass through. An object node that is made by only one functional unit
+    #	can only be reached through that unit, so the inputs of that unit (that are not starting nodes) are also landmarks.
+    #	Starting from the goal nodes, landmarks are found by following these forced producers backwards; nodes with more than one producer
+    #	are not expanded any further, since a solution could take either path to make them.
+    # NOTE: landmarks are ordered by level, which is the length of the shortest chain of units needed to make a node from the starting nodes
+    #	(landmarks at level 0 are not returned, since they are already available from the start).
+    #	This function returns a tuple (landmarks, levels, best_producers), where landmarks is a list of object nodes sorted by level,
+    #	and best_producers maps an object node's key to the unit (index in fga.FOON_lvl3) that makes it in the fewest levels.
+
+    nodes = {}
+    for FU in fga.FOON_lvl3:
+        for N in FU.getInputList() + FU.getOutputList():
+            nodes.setdefault(N.getObjectKey(), N)
+
+    # -- levels are found with a forward pass from the starting nodes, where units are used in order of level:
+    #	a unit can be used once all of its inputs have been reached, and its outputs are then one level higher than its highest input.
+    levels, best_producers = {}, {}
+    missing_inputs, waiting_units = {}, {}
+    for index, FU in enumerate(fga.FOON_lvl3):
+        input_keys = set(N.getObjectKey() for N in FU.getInputList())
+        missing_inputs[index] = len(input_keys)
+        for key in input_keys:
+            waiting_units.setdefault(key, []).append(index)
+
+    ready_units = []
+
+    def _reach_node(key, level, producer=None):
+        if key in levels:
+            return
+        levels[key] = level
+        if producer is not None:
+            best_producers[key] = producer
+
+        for index in waiting_units.get(key, []):
+            missing_inputs[index] -= 1
+            if missing_inputs[index] == 0:
+                heapq.heappush(ready_units, (1 + max([levels[N.getObjectKey()] for N in fga.FOON_lvl3[index].getInputList()] + [0]), index))
+    #enddef
+
+    for key in nodes:
+        if key not in object_producers:
+            _reach_node(key, 0)
+
+    used_units = set()
+    while len(used_units) < len(fga.FOON_lvl3):
+        if not ready_units:
+            # -- the remaining units are blocked by a cycle (e.g., a cup is emptied and then used again to make the inputs it needs),
+            #	so the missing inputs of the blocked unit with the fewest missing inputs are treated as available from the start:
+            index = min([X for X in range(len(fga.FOON_lvl3)) if X not in used_units], key=lambda X: missing_inputs[X])
+            for N in fga.FOON_lvl3[index].getInputList():
+                _reach_node(N.getObjectKey(), 0)
+            continue
+
+        level, index = heapq.heappop(ready_units)
+        used_units.add(index)
+        for N in fga.FOON_lvl3[index].getOutputList():
+            _reach_node(N.getObjectKey(), level, producer=index)
+    #endwhile
+
+    goal_keys = [K for K in nodes if nodes[K].isGoal and K in object_producers]
+    if not goal_keys:
+        # -- if no goal nodes are marked in the graph, then its final products (i.e., nodes that are made but never used) are the goals:
+        goal_keys = [K for K in nodes if K in object_producers and K not in object_consumers]
+
+    landmarks = set(goal_keys)
+    to_expand = list(goal_keys)
+    while to_expand:
+        key = to_expand.pop()
+        if len(object_producers.get(key, [])) != 1:
+            continue
+
+        for N in fga.FOON_lvl3[list(object_producers[key])[0]].getInputList():
+            # -- only inputs that must be made before this node are landmarks (otherwise, they are only part of a cycle):
+            if N.getObjectKey() in landmarks or levels[N.getObjectKey()] == 0:
                 continue
+            if levels[N.getObjectKey()] < levels[key]:
+                landmarks.add(N.getObjectKey())
+                to_expand.append(N.getObjectKey())
+    #endwhile
 
-            if predicate not in already_seen:
-                pddl_file.write('\t(' + predicate[0] + ' ' + predicate[1] + (str(' ' + predicate[2]) if predicate[2] and len(predicate) > 2 else '') + ')\n')
-                already_seen.append(predicate)
+    # -- sort landmarks by level, and then by the order in which they were first seen in the graph:
+    order = {K : X for X, K in enumerate(nodes)}
+    landmarks = sorted([K for K in landmarks if levels[K] > 0], key=lambda K: (levels[K], order[K]))
 
-        pddl_file.write('))\n')
+    return [nodes[K] for K in landmarks], levels, best_producers
+#enddef
 
-        pddl_file.write('\n)')
 
-        # -- make sure to close the file after writing to it:
-        pddl_file.close()
+def _create_landmark_problems(planner_command=None, cache=None):
+    # NOTE: this function decomposes the problem of the loaded FOON into a chain of smaller problems (i.e., stages), where the goals of a stage
+    #	are the landmarks of the next level (see _find_landmarks()) and the initial state of a stage is the result of the stage before it.
+    #	If a planner command is given, each stage is solved in turn, the state is updated using the stage's plan, and all plans are stitched together;
+    #	otherwise, the state is updated by applying the units that make the stage's landmarks (as a prediction of what a plan would do).
+    #	All stages share the same domain file; with --macros, the domain still has an action for each functional unit (see _create_domain_file()),
+    #	so stages that start partway through a macro's chain can be solved with the units that are left.
+    #	Stages whose goals already hold in the state left by the stages before them are skipped.
+
+    landmarks, levels, best_producers = _find_landmarks()
+    if not landmarks:
+        print(' -- [FOON_to_PDDL] : No landmarks were found in the graph!')
+        return None
+
+    stages = {}
+    for N in landmarks:
+        stages.setdefault(levels[N.getObjectKey()], []).append(N)
+    stage_levels = sorted(stages)
+
+    # -- goal nodes must still hold at the end of the plan, so they are also goals of the final stage:
+    for N in landmarks:
+        if N.isGoal and N not in stages[stage_levels[-1]]:
+            stages[stage_levels[-1]].append(N)
+
+    print(' -- [FOON_to_PDDL] : Found ' + str(len(landmarks)) + ' landmark(s) over ' + str(len(stage_levels)) + ' stage(s).')
+
+    # -- the first stage starts with the kitchen items (or the starting nodes of the graph):
+    problem_state = _build_problem_state(fga._identifyKitchenItems(FOON_inputs_file) if FOON_inputs_file else _build_node_index(), goal_nodes=[])
+
+    solve_stages = planner_command is not None and output_target != '-'
+    if solve_stages:
+        domain_text = fos._read_output(FOON_domain_file)
+
+    stitched_plan = []
+    made_nodes = set()
+    num_stages = 0
+
+    def _get_supporting_units(key, units):
+        # -- collect the units needed to make a node (in the order they would be executed), skipping nodes that were already made:
+        if key in made_nodes or key not in best_producers:
+            return
+        made_nodes.add(key)
+
+        for N in fga.FOON_lvl3[best_producers[key]].getInputList():
+            _get_supporting_units(N.getObjectKey(), units)
+        units.append(best_producers[key])
     #enddef
 
-    # -- older table_positions (directly from Alejandro) = ['tablel', 'tablem', 'tabler']
-    table_positions = ['table']
+    for level in stage_levels:
+        goal_set = []
+        for N in stages[level]:
+            _translate_object_node_OCP(N, goal_set)
 
-    FOON_domain_file = os.path.splitext(FOON_subgraph_file)[0] + '_domain.pddl'
-    FOON_problem_file = os.path.splitext(FOON_subgraph_file)[0] + '_problem.pddl'
+        if all(problem_state.hasFact(G) for G in goal_set):
+            # -- nothing needs to be done for this stage (e.g., the goal nodes of the final stage were already made as landmarks):
+            made_nodes.update(N.getObjectKey() for N in stages[level])
+            continue
 
-    # -- create a FOON using the FGA code's _constructFOON() method
-    fga._constructFOON(FOON_subgraph_file)
+        num_stages += 1
 
-    fga.flag_buildObjectToUnitMap = True
+        stage_file = os.path.splitext(FOON_subgraph_file)[0] + '_stage_' + str(num_stages) + '_problem.pddl' + ('.gz' if output_target == 'gzip' else '')
+        print(" -- [FOON_to_PDDL] : Creating problem file for stage " + str(num_stages) + " named '" + stage_file + "'...")
+        print('  -- Landmarks: ' + str([N.getObjectLabel() + ' (' + ', '.join(S[1] for S in N.getStatesList()) + ')' for N in stages[level]]))
 
-    fga._buildInternalMaps()
+        ProblemState(init_facts=problem_state.getFacts(), goal_facts=goal_set).writeProblem(stage_file, output_target)
 
-    if file_type == 1:
-        _create_domain_file()
-    elif file_type == 2:
-        _create_problem_file()
-    else:
-        _create_domain_file()
-        print()
-        _create_problem_file()
-        print()
-    #endif
+        if solve_stages:
+            plan, _ = fpc._solve_PDDL(domain_text, fos._read_output(stage_file), planner_command, cache=cache)
+            if plan is None:
+                print('  -- No plan was found for stage ' + str(num_stages) + '! Please review its problem file for any predicates that are not being satisfied.')
+                return None
+
+            print('  -- Plan found for stage ' + str(num_stages) + ': ' + str(plan))
+            stitched_plan.extend(plan)
+            problem_state.applyFunctionalUnits(plan)
+        else:
+            units = []
+            for N in stages[level]:
+                _get_supporting_units(N.getObjectKey(), units)
+            problem_state.applyFunctionalUnits(units)
+    #endfor
+
+    if not solve_stages:
+        return None
+
+    print('  -- Stitched plan:')
+    for step in stitched_plan:
+        print('\t' + step)
+
+    macro_table_file = os.path.splitext(FOON_subgraph_file)[0] + '_macros.txt'
+    if use_macros and os.path.exists(macro_table_file):
+        stitched_plan = _expand_macro_plan(stitched_plan, _load_macro_table(macro_table_file))
+        print('  -- Plan expanded to functional units: ' + str(stitched_plan))
+
+    return stitched_plan
 #enddef
 
 
 if __name__ == '__main__':
 
+    # -- when PDDL files are streamed to stdout, all other messages are printed to stderr so they do not mix:
+    if '--output=-' in sys.argv or ('--output' in sys.argv and sys.argv.index('--output') + 1 < len(sys.argv) and sys.argv[sys.argv.index('--output') + 1] == '-'):
+        sys.stdout = sys.stderr
+
     print('\n< FOON_to_PDDL: converting FOON graph to PDDL code (last updated: ' + last_updated + ')>\n')
 
     _check_args()
+
+    if batch_files:
+        if pddl_format != 'OCP':
+            sys.exit(" -- ERROR: Batch conversion is only available for the 'OCP' format!")
+
+        # -- these options only make sense for a single file (e.g., workers would all write to stdout or to the same
+        #	'FOON-input_only_nodes.txt'), so they are not silently ignored in a batch:
+        unsupported_flags = [flag for flag, is_set in [('--output=-', output_target == '-'), ('--export_inputs', export_input_nodes), ('--planner', planner_command), ('--landmarks', use_landmarks), ('--database', database_file), ('--watch', watch_mode)] if is_set]
+        if unsupported_flags:
+            sys.exit(' -- ERROR: Batch conversion cannot be used with ' + ', '.join(unsupported_flags) + '!')
+
+        _convert_batch(batch_files, num_workers=num_workers)
+        sys.exit()
+
+    if watch_mode:
+        if pddl_format != 'OCP':
+            sys.exit(" -- ERROR: Watch mode is only available for the 'OCP' format!")
+        if database_file:
+            sys.exit(" -- ERROR: Watch mode cannot be used with a database (--database)!")
+        _watch_FOON(file_type)
+        sys.exit()
+
+    if database_file:
+        if pddl_format != 'OCP':
+            sys.exit(" -- ERROR: Converting from a database (--database) is only available for the 'OCP' format!")
+
+        # -- these options are not supported when units are streamed from a database, so they are not silently ignored:
+        unsupported_flags = [flag for flag, is_set in [('--macros', use_macros), ('--landmarks', use_landmarks), ('--export_inputs', export_input_nodes), ('a kitchen file (FOON_inputs_file)', FOON_inputs_file)] if is_set]
+        if unsupported_flags:
+            sys.exit(' -- ERROR: Converting from a database (--database) cannot be used with ' + ', '.join(unsupported_flags) + '!')
+
     _convert_to_PDDL(pddl_format, file_type)
+
+    if check_files and file_type is None:
+        _check_PDDL_files()
+
+    plan_cache = fpc.PlanCache(plan_cache_dir) if planner_command and use_plan_cache else None
+
+    if use_landmarks and pddl_format == 'OCP':
+        print()
+        _create_landmark_problems(planner_command, cache=plan_cache)
+    elif planner_command and pddl_format == 'OCP':
+        _find_plan(planner_command, cache=plan_cache)
+
+    if plan_cache:
+        plan_cache.printStatistics()